@@ -1,41 +1,114 @@
-import difflib
 import sys
 import os
-import pkgutil
-import importlib
+import threading
 from abc import ABC, abstractmethod
+from importlib import import_module
 
 from dotenv import load_dotenv as dotenv_load_dotenv  # English: Import load_dotenv from python-dotenv.
                                                     # Japanese: python-dotenvからload_dotenvをインポートします。
 from dotenv import dotenv_values as _dotenv_values  # English: Import dotenv_values from python-dotenv.
                                                    # Japanese: python-dotenvからdotenv_valuesをインポートします。
 
-# Import new enhanced system
-from .core import (
-    template_enhanced, 
-    collect_templates_enhanced, 
-    report_duplicates_enhanced,
-    oneenv as oneenv_decorator_enhanced,
-    _oneenv_core,
+# The template system (core, models and therefore pydantic) and the info API are
+# loaded on first attribute access, so that applications which only call
+# load_dotenv()/env() at start-up do not pay for them.
+# テンプレートシステム（core、models、pydantic）と情報APIは最初の属性アクセス時に
+# 読み込まれます。起動時にload_dotenv()/env()だけを使うアプリケーションの負担を避けます。
+_LAZY_ATTRIBUTES = {
+    "template_enhanced": (".core", "template_enhanced"),
+    "collect_templates_enhanced": (".core", "collect_templates_enhanced"),
+    "report_duplicates_enhanced": (".core", "report_duplicates_enhanced"),
+    "oneenv_decorator_enhanced": (".core", "oneenv"),
+    "_oneenv_core": (".core", "_oneenv_core"),
     # New Scaffolding API
-    get_all_template_structure,
-    has_category,
-    get_options,
-    generate_template
-)
-
-# Import info API for advanced usage
-from .info_api import (
-    get_structure_info,
-    get_category_info, 
-    get_option_preview,
-    get_detailed_structure
-)
+    "get_all_template_structure": (".core", "get_all_template_structure"),
+    "has_category": (".core", "has_category"),
+    "get_options": (".core", "get_options"),
+    "generate_template": (".core", "generate_template"),
+    "stream_template": (".core", "stream_template"),
+    "write_template": (".core", "write_template"),
+    "get_render_cache_info": (".core", "get_render_cache_info"),
+    "clear_render_cache": (".core", "clear_render_cache"),
+    "refresh_templates": (".core", "refresh_templates"),
+    "find_variable": (".core", "find_variable"),
+    "search_templates": (".core", "search_templates"),
+    # asyncio API
+    "awarm_up_templates": (".aio", "awarm_up_templates"),
+    "agenerate_template": (".aio", "agenerate_template"),
+    "agenerate_env_example": (".aio", "agenerate_env_example"),
+    "aload_dotenv": (".aio", "aload_dotenv"),
+    "adotenv_values": (".aio", "adotenv_values"),
+    # Info API for advanced usage
+    "get_structure_info": (".info_api", "get_structure_info"),
+    "get_category_info": (".info_api", "get_category_info"),
+    "get_option_preview": (".info_api", "get_option_preview"),
+    "get_detailed_structure": (".info_api", "get_detailed_structure"),
+}
+_LAZY_SUBMODULES = frozenset({"core", "models", "info_api", "scaffolding", "cli", "aio"})
+
+def __getattr__(name):
+    """
+    English: Loads the template system and info API on first access.
+    Japanese: テンプレートシステムと情報APIを最初のアクセス時に読み込みます。
+    """
+    if name in _LAZY_SUBMODULES:
+        return import_module(f".{name}", __name__)
+    try:
+        module_name, attr = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(module_name, __name__), attr)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+# Star-imports also resolve the lazy names (and therefore load the template system)
+# スター・インポートでは遅延読み込みの名前も解決されます（テンプレートシステムを読み込みます）
+__all__ = [
+    "oneenv",
+    "OneEnv",
+    "collect_templates",
+    "report_duplicates",
+    "template",
+    "diff",
+    "generate_env_example",
+    "stream_env_example",
+    "load_dotenv",
+    "dotenv_values",
+    "set_key",
+    "unset_key",
+    "import_templates",
+    "import_all_modules",
+    "NamedEnvironment",
+    "env",
+] + [name for name in _LAZY_ATTRIBUTES if not name.startswith("_")]
 
 # Global registry for template functions  # English: Global registry for storing functions decorated with @oneenv.
                                            # Japanese: @oneenvデコレータが付与された関数を格納するグローバルレジストリ。
 _TEMPLATE_REGISTRY = []
 
+# Registers a function with the core registry once oneenv.core has been imported
+# oneenv.coreがインポートされた後、関数をコアのレジストリに登録する関数
+_register_with_core = None
+
+# Guards _TEMPLATE_REGISTRY/_register_with_core so that a function decorated while
+# oneenv.core is being imported in another thread is handed over exactly once
+# 別スレッドでoneenv.coreのインポート中にデコレートされた関数の引き渡しを一度だけにするロック
+_registry_lock = threading.Lock()
+
+def _attach_core(register):
+    """
+    English: Called by oneenv.core on import; hands over functions decorated before that.
+    Japanese: oneenv.coreのインポート時に呼ばれ、それ以前にデコレートされた関数を引き渡します。
+    """
+    global _register_with_core
+    with _registry_lock:
+        for func in _TEMPLATE_REGISTRY:
+            register(func)
+        _register_with_core = register
+
 def oneenv(func):
     """
     English: Decorator that registers a function providing environment variable templates.
@@ -49,9 +122,12 @@ def oneenv(func):
     出力:
       - 登録の副作用を持ち、元の関数を返します。
     """
-    # Register the function in both legacy and new registries
-    _TEMPLATE_REGISTRY.append(func)
-    oneenv_decorator_enhanced(func)
+    # Register the function in both legacy and new registries.
+    # Until oneenv.core is imported it picks registrations up from _TEMPLATE_REGISTRY.
+    with _registry_lock:
+        _TEMPLATE_REGISTRY.append(func)
+        if _register_with_core is not None:
+            _register_with_core(func)
     return func
 
 class OneEnv(ABC):
@@ -81,6 +157,7 @@ def collect_templates():
        { key: { "config": { ... }, "sources": [関数名, ...] }, ... }
     """
     # Use enhanced collection with both legacy and plugin support
+    from .core import collect_templates_enhanced
     return collect_templates_enhanced()
 
 def report_duplicates():
@@ -92,13 +169,18 @@ def report_duplicates():
              Pydanticモデルとentry-pointsサポートで拡張されました。
     """
     # Use enhanced duplicate reporting
+    from .core import report_duplicates_enhanced
     report_duplicates_enhanced()
 
-def template(debug=False):
+def template(debug=False, scan="import", processes=None):
     """
     English: Generates the text content of the .env.example file based on collected templates.
              Each variable includes its description, source, and default value.
              Now enhanced with Pydantic models and entry-points support.
+    Input:
+      - debug: Enable debug output (default: False)
+      - scan: How import_templates() finds template modules ("import" or "ast")
+      - processes: Worker processes for scan="ast" (see import_templates)
     Output:
       - A string with the content for .env.example.
     Japanese: 収集したテンプレートに基づいて、.env.exampleファイルのテキスト内容を生成します。
@@ -109,9 +191,10 @@ def template(debug=False):
     """
     # Use the enhanced template generation system
     # Import all modules to discover @oneenv decorated functions (legacy support)
-    imported_modules = import_templates(debug)
+    imported_modules = import_templates(debug, scan=scan, processes=processes)
     
     # Use enhanced template generation with both legacy and plugin support
+    from .core import template_enhanced
     return template_enhanced(debug)
 
 def diff(previous_text, current_text):
@@ -131,6 +214,7 @@ def diff(previous_text, current_text):
     出力:
       - 差分を表す文字列を返します。
     """
+    import difflib
     previous_lines = previous_text.splitlines()
     current_lines = current_text.splitlines()
     differ = difflib.Differ()
@@ -157,22 +241,62 @@ def diff(previous_text, current_text):
         i += 1
     return "\n".join(result_lines)
 
-def generate_env_example(output_path, debug=False):
+def generate_env_example(output_path, debug=False, scan="import", processes=None, skip_unchanged=False):
     """
     English: Generates the .env.example file at the specified output path using the current templates.
     Input:
       - output_path: The file path where the .env.example should be written.
       - debug: Enable debug output (default: False)
+      - scan: How template modules are found ("import" or "ast", see import_templates)
+      - processes: Worker processes for scan="ast" (see import_templates)
+      - skip_unchanged: Leave the file untouched (content and mtime) when it already holds
+        the generated content (the file is always replaced atomically via a temporary file)
+    Output:
+      - True if the file was written, False if it was already up to date.
     Japanese: 現在のテンプレートを用いて、指定された出力パスに.env.exampleファイルを生成します。
     入力:
       - output_path: .env.exampleを書き込むファイルパス
       - debug: デバッグ出力を有効にする（デフォルト: False）
+      - scan: テンプレートモジュールの探索方法（"import" または "ast"、import_templates参照）
+      - processes: scan="ast" のワーカープロセス数（import_templates参照）
+      - skip_unchanged: 内容が同じ場合はファイルを書き換えない（書き込みは常に一時ファイル経由でアトミックに置換）
+    出力:
+      - ファイルを書き込んだ場合True、内容が同じで書き込まなかった場合Falseを返します。
+    """
+    import_templates(debug, scan=scan, processes=processes)
+    from .core import iter_template_enhanced
+    from .writer import write_text
+    # English: Stream the generated content into a temporary file that replaces output_path
+    #          only once it is complete, so a failed render leaves the previous file intact.
+    # Japanese: 生成内容を一時ファイルに逐次書き込み、完成後にoutput_pathへ置き換えます。
+    #          生成に失敗しても既存のファイルはそのまま残ります。
+    return write_text(output_path, iter_template_enhanced(debug), skip_unchanged=skip_unchanged)
+
+def stream_env_example(fp, debug=False, scan="import", processes=None):
     """
-    content = template(debug=debug)
-    # English: Write the generated content to the specified file.
-    # Japanese: 生成された内容を指定されたファイルに書き込みます。
-    with open(output_path, 'w', encoding='utf-8') as file:
-        file.write(content)
+    English: Writes the same content as template() to an open text file (or any object with
+             write(str), such as socket.makefile('w')) chunk by chunk, without building the
+             whole content in memory.
+    Input:
+      - fp: Destination with a write(str) method
+      - debug, scan, processes: As for template()
+    Output:
+      - The number of characters written.
+    Japanese: template()と同じ内容を、開いているテキストファイル（またはwrite(str)を持つ
+             オブジェクト）にチャンク単位で書き込みます。内容全体をメモリ上に構築しません。
+    入力:
+      - fp: write(str)を持つ書き込み先
+      - debug, scan, processes: template()と同じ
+    出力:
+      - 書き込んだ文字数を返します。
+    """
+    import_templates(debug, scan=scan, processes=processes)
+    from .core import iter_template_enhanced
+    written = 0
+    for chunk in iter_template_enhanced(debug):
+        fp.write(chunk)
+        written += len(chunk)
+    return written
 
 def load_dotenv(dotenv_path=None, override=False):
     """
@@ -284,20 +408,14 @@ def unset_key(dotenv_path, key_to_unset):
 
 # 新規: sys.path 内のモジュールを自動探索・インポートする仕組み
 # New: Automatically discover and import modules in sys.path to trigger the @oneenv decorators.
-def import_templates(debug=False):
+def _template_search_roots():
     """
-    English: Automatically discovers and imports modules within directories under the current working directory in sys.path.
-    This triggers the registration of all functions decorated with @oneenv.
-    Japanese: 現在の作業ディレクトリ以下にあるsys.path上のディレクトリ内のモジュールを自動探索・インポートします。
-    これにより、@oneenvデコレータが付与されたすべての関数が登録されることを保証します。
-    Output:
-      - A list of successfully imported module names.
-      - 登録に成功したモジュール名のリストを返します。
+    English: Directories in sys.path that are under the current working directory.
+    Japanese: sys.pathのうち現在の作業ディレクトリ以下にあるディレクトリを返します。
     """
-
     cwd = os.getcwd()  # English: Get the current working directory.
                       # Japanese: 現在の作業ディレクトリを取得します。
-    imported_modules = []
+    roots = []
     for path_item in sys.path:
         abs_path = os.path.abspath(path_item)
         if not os.path.isdir(abs_path):
@@ -306,14 +424,76 @@ def import_templates(debug=False):
         # 現在の作業ディレクトリ下にあるディレクトリに限定して探索し、システムライブラリを除外します。
         if not abs_path.startswith(cwd):
             continue
-        for finder, modname, ispkg in pkgutil.iter_modules([abs_path]):
-            try:
-                importlib.import_module(modname)
-                imported_modules.append(modname)
-                if debug:
-                    print(f"Imported module: {modname}")
-            except Exception as e:
-                print(f"OneEnv import_templates: Could not import module {modname} from {abs_path}: {e}")
+        roots.append(abs_path)
+    return roots
+
+def import_templates(debug=False, scan="import", processes=None):
+    """
+    English: Automatically discovers and imports modules within directories under the current working directory in sys.path.
+    This triggers the registration of all functions decorated with @oneenv.
+    Input:
+      - scan: "import" imports every top-level module (default).
+              "ast" parses candidate files and imports only the modules that
+              contain @oneenv functions or OneEnv subclasses, so the import-time
+              side effects of unrelated modules are avoided. When ONEENV_CACHE_DIR
+              is set, scan results are cached by path, size and mtime.
+      - processes: With scan="ast", parse files in this many worker processes
+                   (0: one per CPU). Workers only report module names; importing
+                   still happens in this process.
+    When pyproject.toml in the current directory lists template modules under
+    [tool.oneenv] templates, exactly those are imported and sys.path is not
+    searched (scan and processes are ignored).
+    Japanese: 現在の作業ディレクトリ以下にあるsys.path上のディレクトリ内のモジュールを自動探索・インポートします。
+    これにより、@oneenvデコレータが付与されたすべての関数が登録されることを保証します。
+    入力:
+      - scan: "import" はすべてのトップレベルモジュールをインポートします（デフォルト）。
+              "ast" は候補ファイルを構文解析し、@oneenv関数またはOneEnvサブクラスを
+              含むモジュールだけをインポートします。ONEENV_CACHE_DIRが設定されている場合、
+              スキャン結果はパス・サイズ・mtimeでキャッシュされます。
+      - processes: scan="ast" の場合、この数のワーカープロセスでファイルを解析します
+                   （0: CPU数）。ワーカーはモジュール名のみを返し、インポートは
+                   このプロセスで行われます。
+    現在のディレクトリのpyproject.tomlで[tool.oneenv] templatesにテンプレート
+    モジュールが列挙されている場合は、それらだけをインポートし、sys.pathの
+    探索は行いません（scanとprocessesは無視されます）。
+    Output:
+      - A list of successfully imported module names.
+      - 登録に成功したモジュール名のリストを返します。
+    """
+    if scan not in ("import", "ast"):
+        raise ValueError(f"scan must be 'import' or 'ast', got {scan!r}")
+    if processes is not None and scan != "ast":
+        raise ValueError("processes is only supported with scan='ast'")
+
+    import pkgutil
+    import importlib
+    from .manifest import expand_template_manifest, load_template_manifest
+
+    imported_modules = []
+    manifest = load_template_manifest()
+    if manifest is not None:
+        if debug:
+            print(f"Using [tool.oneenv] templates: {manifest}")
+        candidates = [(modname, None)
+                      for modname in expand_template_manifest(manifest, _template_search_roots())]
+    elif scan == "ast":
+        from .scanner import find_template_modules
+        candidates = [(modname, None) for modname in find_template_modules(_template_search_roots(), processes=processes)]
+    else:
+        candidates = [
+            (modname, abs_path)
+            for abs_path in _template_search_roots()
+            for finder, modname, ispkg in pkgutil.iter_modules([abs_path])
+        ]
+    for modname, abs_path in candidates:
+        try:
+            importlib.import_module(modname)
+            imported_modules.append(modname)
+            if debug:
+                print(f"Imported module: {modname}")
+        except Exception as e:
+            location = f" from {abs_path}" if abs_path else ""
+            print(f"OneEnv import_templates: Could not import module {modname}{location}: {e}")
     return imported_modules
 
 def import_all_modules(package, debug=False):
@@ -354,6 +534,9 @@ class NamedEnvironment:
         """
         self.name = name
         self._env_vars = {}
+        # Writers replace _env_vars with a new dict, so readers never see a partial merge
+        # 書き込みは新しい辞書で置き換えるため、読み込み側は途中の状態を参照しません
+        self._lock = threading.Lock()
     
     def load_dotenv(self, dotenv_path=None, override=False):
         """
@@ -381,16 +564,27 @@ class NamedEnvironment:
             env_values = _dotenv_values(dotenv_path=dotenv_path)
             if env_values is None:
                 return False
-            if override:
-                self._env_vars = env_values.copy()
-            else:
-                for key, value in env_values.items():
-                    if key not in self._env_vars:
-                        self._env_vars[key] = value
+            with self._lock:
+                if override:
+                    self._env_vars = env_values.copy()
+                else:
+                    merged = dict(self._env_vars)
+                    for key, value in env_values.items():
+                        if key not in merged:
+                            merged[key] = value
+                    self._env_vars = merged
             return True
         except Exception:
             return False
     
+    async def aload_dotenv(self, dotenv_path=None, override=False):
+        """
+        English: Awaitable load_dotenv(); reads the file without blocking the event loop.
+        Japanese: load_dotenv()の非同期版です。イベントループをブロックせずにファイルを読み込みます。
+        """
+        import asyncio
+        return await asyncio.to_thread(self.load_dotenv, dotenv_path, override)
+    
     def get(self, key, default=None):
         """
         English: Get environment variable value with fallback logic.
@@ -409,14 +603,15 @@ class NamedEnvironment:
           - 環境変数の値またはデフォルト値
         """
         # First check this environment's variables
-        if key in self._env_vars:
-            return self._env_vars[key]
+        env_vars = self._env_vars
+        if key in env_vars:
+            return env_vars[key]
         
         # For named environments, fall back to common environment
         if self.name is not None:
-            common_env = _get_common_environment()
-            if key in common_env._env_vars:
-                return common_env._env_vars[key]
+            common_vars = _get_common_environment()._env_vars
+            if key in common_vars:
+                return common_vars[key]
         
         # Finally, check OS environment variables
         return os.environ.get(key, default)
@@ -424,6 +619,7 @@ class NamedEnvironment:
 
 # Global registry for named environments
 _named_environments = {}
+_named_environments_lock = threading.Lock()
 
 
 def _get_common_environment():
@@ -431,9 +627,7 @@ def _get_common_environment():
     English: Get or create the common environment instance.
     Japanese: 共通環境インスタンスを取得または作成します。
     """
-    if None not in _named_environments:
-        _named_environments[None] = NamedEnvironment(None)
-    return _named_environments[None]
+    return env(None)
 
 
 def env(name=None):
@@ -449,7 +643,13 @@ def env(name=None):
     出力:
       - NamedEnvironment インスタンス
     """
-    if name not in _named_environments:
-        _named_environments[name] = NamedEnvironment(name)
-    return _named_environments[name]
+    environment = _named_environments.get(name)
+    if environment is None:
+        # Concurrent first calls must all get the same instance
+        # 同時の初回呼び出しでも同じインスタンスを返す
+        with _named_environments_lock:
+            environment = _named_environments.get(name)
+            if environment is None:
+                environment = _named_environments[name] = NamedEnvironment(name)
+    return environment
  
\ No newline at end of file
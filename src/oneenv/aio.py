@@ -0,0 +1,90 @@
+"""
+OneEnv asyncio API
+asyncio向けのOneEnv API
+
+Awaitable counterparts of the blocking entry points. File I/O and plugin
+discovery run in the default executor (asyncio.to_thread), so they never
+block the event loop, and several .env files can be loaded at once with
+asyncio.gather(). The template catalogue is safe for concurrent use, so
+generations started from different tasks share a single plugin load.
+ブロッキングするAPIのawait可能な版です。ファイルI/Oとプラグイン探索は
+デフォルトのエグゼキュータ（asyncio.to_thread）で実行されるため
+イベントループをブロックせず、asyncio.gather()で複数の.envファイルを
+同時に読み込めます。
+
+    await oneenv.awarm_up_templates()
+    common, app = await asyncio.gather(
+        oneenv.adotenv_values(".env"),
+        oneenv.adotenv_values(".env.app"),
+    )
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+
+async def awarm_up_templates(full: bool = False, debug: bool = False) -> None:
+    """
+    Build the template catalogue off the event loop
+    テンプレートカタログをイベントループ外で構築
+
+    Call once at start-up so that the first request does not pay for plugin
+    discovery.
+
+    Args:
+        full: Also import plugins that advertise their structure in metadata
+              (needed by find_variable/search_templates/collect_all_options)
+        debug: Enable debug output
+    """
+    from .core import _scaffolding_processor
+
+    warm_up = _scaffolding_processor.ensure_loaded if full else _scaffolding_processor.ensure_index
+    await asyncio.to_thread(warm_up, debug)
+
+
+async def agenerate_template(dest: str, generation_range: List[Dict[str, str]],
+                             skip_unchanged: bool = False) -> str:
+    """
+    Awaitable generate_template()
+    generate_template()の非同期版
+    """
+    from .core import generate_template
+
+    return await asyncio.to_thread(generate_template, dest, generation_range, skip_unchanged)
+
+
+async def agenerate_env_example(output_path: str, debug: bool = False, scan: str = "import",
+                                processes: Optional[int] = None, skip_unchanged: bool = False) -> bool:
+    """
+    Awaitable generate_env_example()
+    generate_env_example()の非同期版
+    """
+    from . import generate_env_example
+
+    return await asyncio.to_thread(generate_env_example, output_path, debug, scan, processes,
+                                   skip_unchanged)
+
+
+async def aload_dotenv(dotenv_path: Optional[str] = None, override: bool = False) -> bool:
+    """
+    Awaitable load_dotenv()
+    load_dotenv()の非同期版
+
+    Files loaded concurrently update os.environ in completion order; with
+    override=True, load them sequentially when the precedence matters.
+    同時に読み込んだファイルは完了順にos.environを更新します。
+    """
+    from . import load_dotenv
+
+    return await asyncio.to_thread(load_dotenv, dotenv_path, override)
+
+
+async def adotenv_values(dotenv_path: Optional[str] = None,
+                         encoding: str = 'utf-8') -> Dict[str, Optional[str]]:
+    """
+    Awaitable dotenv_values()
+    dotenv_values()の非同期版
+    """
+    from . import dotenv_values
+
+    return await asyncio.to_thread(dotenv_values, dotenv_path, encoding)
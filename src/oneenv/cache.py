@@ -0,0 +1,63 @@
+"""
+OneEnv On-disk Cache Helpers
+オンディスクキャッシュ用のヘルパー関数
+
+Caching is opt-in: it is enabled by pointing the ONEENV_CACHE_DIR environment
+variable at a writable directory.
+キャッシュはオプトイン方式で、環境変数ONEENV_CACHE_DIRに書き込み可能なディレクトリを指定すると有効になります。
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Optional
+
+CACHE_DIR_ENV = "ONEENV_CACHE_DIR"
+
+
+def get_cache_dir() -> Optional[str]:
+    """
+    Return the cache directory, or None when caching is disabled
+    キャッシュディレクトリを返す（無効な場合はNone）
+    """
+    path = os.environ.get(CACHE_DIR_ENV, "").strip()
+    if not path:
+        return None
+    return os.path.abspath(os.path.expanduser(path))
+
+
+def read_json_cache(path: str) -> Optional[Any]:
+    """
+    Read a JSON cache file, returning None if it is missing or unreadable
+    JSONキャッシュファイルを読み込む（存在しない・壊れている場合はNone）
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_cache(path: str, data: Any) -> bool:
+    """
+    Atomically write a JSON cache file; failures are ignored
+    JSONキャッシュファイルをアトミックに書き込む（失敗は無視）
+
+    Returns:
+        True if the cache file was written
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".oneenv-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    except (OSError, TypeError, ValueError):
+        return False
+    return True
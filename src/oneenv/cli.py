@@ -1,10 +1,51 @@
 import argparse
 import sys
-import json
 
-from oneenv import template, generate_env_example, diff
-from oneenv.info_api import get_structure_info, get_category_info, get_option_preview
-from oneenv.scaffolding import generate_scaffolding_env
+# Subcommand handlers are imported inside main() once the command is known,
+# so that e.g. `oneenv diff` does not load pydantic and entry-point discovery.
+# サブコマンドの処理はコマンドが確定してからmain()内でインポートします。
+# これにより `oneenv diff` などでpydanticやentry-point探索を読み込みません。
+
+def _positive_int(value):
+    """
+    English: argparse type for options that take a count of at least 1.
+    Japanese: 1以上の数を受け取るオプション用のargparseの型です。
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+def _add_scan_arguments(parser):
+    """
+    English: Adds the options controlling how @oneenv template modules are found.
+    Japanese: @oneenvテンプレートモジュールの探索方法を指定するオプションを追加します。
+    """
+    parser.add_argument(
+        "--scan",
+        choices=["import", "ast"],
+        default="import",
+        help="How to find @oneenv template modules: import every module (default) "
+             "or parse sources and import only modules that register templates"
+    )
+    parser.add_argument(
+        "--scan-processes",
+        type=int,
+        metavar="N",
+        help="Parse sources in N worker processes (0: one per CPU); implies --scan ast"
+    )
+
+def _import_templates(args):
+    """
+    English: Imports @oneenv template modules as selected by --scan/--scan-processes.
+    Japanese: --scan/--scan-processesの指定に従って@oneenvテンプレートモジュールをインポートします。
+    """
+    from oneenv import import_templates
+    scan = "ast" if args.scan_processes is not None else args.scan
+    import_templates(args.debug, scan=scan, processes=args.scan_processes)
 
 def main():
     """
@@ -25,16 +66,25 @@ def main():
                            help="Show detailed info for a category")
     info_group.add_argument("--preview", nargs=2, metavar=("CATEGORY", "OPTION"),
                            help="Preview specific option template")
+    info_group.add_argument("--which", metavar="VAR",
+                           help="Show which plugins/options define a variable (VAR* for a prefix search)")
     
     # Output options
     template_parser.add_argument("--json", action="store_true",
-                                help="Output in JSON format (for --structure and --info)")
+                                help="Output in JSON format (for --structure, --info and --which)")
     template_parser.add_argument(
         "-o", "--output",
         help="Output file path (default: .env.example)",
         default=".env.example"
     )
+    template_parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Leave the output file untouched when its content would not change "
+             "(otherwise replace it atomically)"
+    )
     template_parser.add_argument("-d", "--debug", action="store_true", help="Enable debug output")
+    _add_scan_arguments(template_parser)
 
     # Generate command
     generate_parser = subparsers.add_parser("generate", help="Generate scaffolding environment configuration")
@@ -59,6 +109,23 @@ def main():
         help="Force interactive mode even when categories are specified"
     )
 
+    # Search command
+    search_parser = subparsers.add_parser("search", help="Search template variables by name, description, category or option")
+    search_parser.add_argument(
+        "query",
+        nargs="+",
+        help="Search terms (all must match; a term may be the start of a word)"
+    )
+    search_parser.add_argument(
+        "-n", "--limit",
+        type=_positive_int,
+        default=20,
+        help="Maximum number of results (default: 20)"
+    )
+    search_parser.add_argument("--json", action="store_true", help="Output in JSON format")
+    search_parser.add_argument("-d", "--debug", action="store_true", help="Enable debug output")
+    _add_scan_arguments(search_parser)
+
     # Diff command
     diff_parser = subparsers.add_parser("diff", help="Show differences between two .env files")
     diff_parser.add_argument(
@@ -73,6 +140,9 @@ def main():
     args = parser.parse_args()
 
     if args.command == "template":
+        import json
+        from oneenv import generate_env_example
+        from oneenv.info_api import get_structure_info, get_category_info, get_option_preview
         try:
             # Handle info commands
             if args.structure:
@@ -97,15 +167,37 @@ def main():
                 print(result)
                 return
             
+            elif args.which:
+                from oneenv.core import find_variable
+                _import_templates(args)
+                prefix = args.which.endswith("*")
+                locations = find_variable(args.which.rstrip("*"), prefix=prefix)
+                if args.json:
+                    print(json.dumps([loc.to_dict() for loc in locations], indent=2, ensure_ascii=False))
+                elif not locations:
+                    print(f"No template defines {args.which}")
+                else:
+                    for loc in locations:
+                        where = f"{loc.category}/{loc.option}" if loc.category else "(legacy template)"
+                        print(f"{loc.variable}: {where} from {loc.source or 'unknown'} [{loc.importance}]")
+                return
+            
             # Default behavior: generate template
-            generate_env_example(args.output, debug=args.debug)
-            print(f"Generated template at: {args.output}")
+            scan = "ast" if args.scan_processes is not None else args.scan
+            changed = generate_env_example(args.output, debug=args.debug, scan=scan,
+                                           processes=args.scan_processes,
+                                           skip_unchanged=args.skip_unchanged)
+            if changed:
+                print(f"Generated template at: {args.output}")
+            else:
+                print(f"Template unchanged: {args.output}")
             
         except Exception as e:
             print(f"Error: {e}", file=sys.stderr)
             sys.exit(1)
 
     elif args.command == "generate":
+        from oneenv.scaffolding import generate_scaffolding_env
         try:
             result = generate_scaffolding_env(
                 categories=args.categories if args.categories else None,
@@ -126,7 +218,30 @@ def main():
             print(f"Error generating scaffolding environment: {e}", file=sys.stderr)
             sys.exit(1)
 
+    elif args.command == "search":
+        import json
+        from oneenv.core import search_templates
+        try:
+            # Legacy @oneenv templates are only registered once their modules are imported
+            _import_templates(args)
+            results = search_templates(" ".join(args.query), limit=args.limit)
+            if args.json:
+                print(json.dumps([result.to_dict() for result in results], indent=2, ensure_ascii=False))
+            elif not results:
+                print(f"No variables match: {' '.join(args.query)}")
+            else:
+                for result in results:
+                    loc = result.location
+                    where = f"{loc.category}/{loc.option}" if loc.category else "(legacy template)"
+                    summary = result.description.splitlines()[0] if result.description else ""
+                    print(f"{loc.variable}  {where} from {loc.source or 'unknown'}")
+                    print(f"    {summary}")
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
     elif args.command == "diff":
+        from oneenv import diff
         try:
             with open(args.previous, 'r', encoding='utf-8') as f:
                 previous_text = f.read()
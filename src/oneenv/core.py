@@ -8,7 +8,10 @@ and new entry-points based plugins with Pydantic model validation.
 import sys
 import locale
 import os
-from typing import Dict, List, Any, Optional, Callable
+import threading
+import itertools
+from collections import OrderedDict
+from typing import Dict, List, Any, Iterable, Iterator, NamedTuple, Optional, Callable, TextIO
 
 # Handle different Python versions for importlib.metadata
 if sys.version_info < (3, 10):
@@ -17,6 +20,11 @@ else:
     from importlib.metadata import entry_points
 
 try:
+    from .discovery import (
+        EntryPointDiscovery, LoadedEntryPoint, entry_point_key, unload_entry_point_modules
+    )
+    from .indexes import SearchIndex, SearchResult, VariableIndex, VariableLocation
+    from .writer import write_text
     from .models import (
         EnvVarConfig, 
         EnvTemplate, 
@@ -27,6 +35,7 @@ try:
         template_function_to_env_template,
         validate_scaffolding_format,
         scaffolding_template_function_to_env_options,
+        build_env_options,
         env_var_config_to_dict
     )
 except ImportError:
@@ -34,6 +43,11 @@ except ImportError:
     import sys
     import os
     sys.path.insert(0, os.path.dirname(__file__))
+    from discovery import (
+        EntryPointDiscovery, LoadedEntryPoint, entry_point_key, unload_entry_point_modules
+    )
+    from indexes import SearchIndex, SearchResult, VariableIndex, VariableLocation
+    from writer import write_text
     from models import (
         EnvVarConfig, 
         EnvTemplate, 
@@ -44,9 +58,41 @@ except ImportError:
         template_function_to_env_template,
         validate_scaffolding_format,
         scaffolding_template_function_to_env_options,
+        build_env_options,
         env_var_config_to_dict
     )
 
+# Streaming renderers yield chunks of about this many characters
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def iter_joined_lines(lines: Iterable[str], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yield chunks whose concatenation equals "\n".join(lines)
+    連結すると"\n".join(lines)と同一になるチャンクを順に返す
+    
+    Lines are buffered into chunks of about `chunk_size` characters, so memory
+    stays bounded however long the output is.
+    """
+    buffer: List[str] = []
+    size = 0
+    separator = ""
+    for line in lines:
+        buffer.append(separator)
+        buffer.append(line)
+        separator = "\n"
+        size += len(line) + 1
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+# Registry versions are unique across OneEnvCore instances (see legacy_version)
+_registry_versions = itertools.count(1)
+
 
 class OneEnvCore:
     """
@@ -54,10 +100,17 @@ class OneEnvCore:
     レガシーシステムと新システムの両方をサポートするOneEnvコア機能
     """
     
-    def __init__(self, entry_point_group: str = "oneenv.templates"):
+    def __init__(self,
+                 entry_point_group: str = "oneenv.templates",
+                 discovery: Optional[EntryPointDiscovery] = None):
         self.entry_point_group = entry_point_group
+        self.discovery = discovery or EntryPointDiscovery(entry_point_group)
         self.template_collection = TemplateCollection()
         self._legacy_registry: List[Callable] = []
+        self._registry_version = next(_registry_versions)
+        # (legacy_version, merged records) of the last collection made for lookups
+        self._legacy_records: Optional[tuple] = None
+        self._legacy_lock = threading.Lock()
     
     def _detect_locale(self) -> str:
         """
@@ -122,29 +175,68 @@ class OneEnvCore:
         レガシーデコレータベースのテンプレート関数を登録
         """
         self._legacy_registry.append(func)
+        self._registry_version = next(_registry_versions)
         return func
     
+    def clear_legacy_registry(self) -> None:
+        """
+        Remove all registered legacy template functions
+        登録済みのレガシーテンプレート関数をすべて削除
+        """
+        self._legacy_registry.clear()
+        self._registry_version = next(_registry_versions)
+    
+    @property
+    def legacy_version(self) -> tuple:
+        """Changes when the decorator registry or the loaded plugin results change"""
+        # The length also catches the registry list being cleared directly
+        return (self._registry_version, len(self._legacy_registry), self.discovery.generation)
+    
+    def get_legacy_records(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Merged records of the legacy and groups-format templates, collected once per legacy_version
+        レガシー形式・groups形式テンプレートのマージ済みレコード（legacy_versionごとに一度だけ収集）
+        
+        Used by the lookup indexes so that a query does not call every template function again.
+        """
+        cached = self._legacy_records
+        if cached is not None and cached[0] == self.legacy_version:
+            return cached[1]
+        with self._legacy_lock:
+            cached = self._legacy_records
+            if cached is not None and cached[0] == self.legacy_version:
+                return cached[1]
+            records = self.collect_all_templates().get_merged_records()
+            # Read the version after collecting: discovery may have loaded plugins
+            self._legacy_records = (self.legacy_version, records)
+            return records
+    
     def discover_entry_point_templates(self, debug: bool = False) -> List[EnvTemplate]:
         """
         Discover and load templates from entry-points
         Entry-pointsからテンプレートを発見・読み込み
+        
+        Plugins are loaded through the shared discovery engine, so an entry
+        point already loaded by the scaffolding processor is not loaded again.
         """
         discovered_templates = []
         
         try:
             template_eps = entry_points(group=self.entry_point_group)
+            loaded = self.discovery.load(template_eps, debug)
             
-            for ep in template_eps:
+            for ep in loaded:
+                # Scaffolding-format plugins are handled by ScaffoldingTemplateProcessor
+                if ep.kind == "scaffolding":
+                    continue
+                
                 try:
-                    # Load the entry-point function
-                    template_func = ep.load()
-                    
-                    # Call the function to get template data
-                    template_result = template_func()
+                    if ep.error is not None:
+                        raise ep.error
                     
                     # Convert to EnvTemplate with validation
                     env_template = self._convert_template_result_to_model(
-                        template_result, f"plugin:{ep.name}"
+                        ep.result, f"plugin:{ep.name}"
                     )
                     
                     discovered_templates.append(env_template)
@@ -169,7 +261,7 @@ class OneEnvCore:
         """
         legacy_templates = []
         
-        for func in self._legacy_registry:
+        for func in list(self._legacy_registry):
             try:
                 # Call the legacy function
                 template_dict = func()
@@ -246,6 +338,18 @@ class OneEnvCore:
         Generate .env.example content with enhanced template processing
         拡張されたテンプレート処理で.env.exampleコンテンツを生成
         """
+        return "".join(self.iter_env_example_content(discover_plugins, discover_legacy, debug))
+    
+    def iter_env_example_content(self,
+                                 discover_plugins: bool = True,
+                                 discover_legacy: bool = True,
+                                 debug: bool = False) -> Iterator[str]:
+        """
+        Generate .env.example content as a stream of chunks
+        .env.exampleコンテンツをチャンクのストリームとして生成
+        
+        The chunks concatenate to exactly generate_env_example_content().
+        """
         if debug:
             print("\nDiscovering templates from all sources...")
         
@@ -269,12 +373,14 @@ class OneEnvCore:
             print("")
         
         # Get grouped variables organized by importance and group
-        grouped_variables = collection.get_grouped_variables()
-        
-        # Generate content
-        lines = []
-        lines.append("# Auto-generated by OneEnv")
-        lines.append("")
+        # (lightweight records: rendering needs no pydantic models)
+        grouped_variables = collection.get_grouped_records()
+        yield from iter_joined_lines(self._iter_env_example_lines(grouped_variables))
+    
+    def _iter_env_example_lines(self, grouped_variables: Dict[str, Dict[str, Any]]) -> Iterator[str]:
+        """Lines of the .env.example file, without line terminators"""
+        yield "# Auto-generated by OneEnv"
+        yield ""
         
         # Process by importance levels
         importance_levels = ["critical", "important", "optional"]
@@ -285,8 +391,8 @@ class OneEnvCore:
                 
             # Add importance section header based on locale
             importance_headers = self._get_importance_headers()
-            lines.append(importance_headers[importance])
-            lines.append("")
+            yield importance_headers[importance]
+            yield ""
             
             # Sort groups alphabetically within each importance level
             sorted_groups = sorted(grouped_variables[importance].items())
@@ -294,8 +400,8 @@ class OneEnvCore:
             for group_name, group_vars in sorted_groups:
                 # Add group header if there are multiple groups or it's not "General"
                 if len(sorted_groups) > 1 or group_name != "General":
-                    lines.append(f"# ----- {group_name} -----")
-                    lines.append("")
+                    yield f"# ----- {group_name} -----"
+                    yield ""
                 
                 # Sort variables within group alphabetically
                 sorted_vars = sorted(group_vars.items())
@@ -306,9 +412,9 @@ class OneEnvCore:
                     
                     # Add source information
                     sources_str = ", ".join(sorted(sources))
-                    lines.append(f"# (Defined in: {sources_str})")
+                    yield f"# (Defined in: {sources_str})"
                     
-                    # Use Pydantic model attributes
+                    # EnvVarRecord exposes the same attributes as EnvVarConfig
                     description = config.description
                     default_value = config.default
                     required_value = config.required
@@ -320,28 +426,26 @@ class OneEnvCore:
                         if stripped_line:
                             # Skip source attribution lines that start with "# From"
                             if not stripped_line.startswith("# From "):
-                                lines.append(f"# {stripped_line}")
+                                yield f"# {stripped_line}"
                             else:
                                 # Add source attribution as-is
-                                lines.append(f"{stripped_line}")
+                                yield f"{stripped_line}"
                     
                     # Add required marker
                     if required_value:
-                        lines.append("# Required")
+                        yield "# Required"
                     
                     # Add choices
                     if choices_value:
-                        lines.append(f"# Choices: {', '.join(choices_value)}")
+                        yield f"# Choices: {', '.join(choices_value)}"
                     
                     # Add variable assignment
-                    lines.append(f"{var_name}={default_value}")
-                    lines.append("")
+                    yield f"{var_name}={default_value}"
+                    yield ""
                 
                 # Add extra space between groups
                 if len(sorted_groups) > 1:
-                    lines.append("")
-        
-        return "\n".join(lines)
+                    yield ""
     
     def get_legacy_compatible_templates(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -349,20 +453,27 @@ class OneEnvCore:
         後方互換性のためにレガシー辞書形式でテンプレートを返す
         """
         collection = self.collect_all_templates()
-        merged_variables = collection.get_merged_variables()
+        merged_variables = collection.get_merged_records()
         
         legacy_format = {}
         for var_name, info in merged_variables.items():
             legacy_format[var_name] = {
-                "config": env_var_config_to_dict(info["config"]),
+                "config": info["config"].to_dict(),
                 "sources": info["sources"]
             }
         
         return legacy_format
 
 
+# Shared discovery pass used by both the legacy core and the scaffolding processor
+_entry_point_discovery = EntryPointDiscovery()
+
 # Global instance for compatibility with existing API
-_oneenv_core = OneEnvCore()
+_oneenv_core = OneEnvCore(discovery=_entry_point_discovery)
+
+# oneenv.oneenv defers to this registry once it exists (the package does not import core eagerly)
+if __package__ and __package__ in sys.modules:
+    sys.modules[__package__]._attach_core(_oneenv_core.register_legacy_function)
 
 # Decorator for legacy compatibility
 def oneenv(func: Callable) -> Callable:
@@ -381,6 +492,10 @@ def template_enhanced(debug: bool = False) -> str:
     """Enhanced version of template generation using Pydantic models"""
     return _oneenv_core.generate_env_example_content(debug=debug)
 
+def iter_template_enhanced(debug: bool = False) -> Iterator[str]:
+    """Streaming version of template_enhanced(): chunks of the same content"""
+    return _oneenv_core.iter_env_example_content(debug=debug)
+
 def report_duplicates_enhanced(debug: bool = False) -> None:
     """Enhanced version of duplicate reporting"""
     collection = _oneenv_core.collect_all_templates(debug=debug)
@@ -396,93 +511,524 @@ def get_template_registry() -> List[Callable]:
 
 def clear_template_registry() -> None:
     """Clear the legacy template function registry (useful for testing)"""
-    _oneenv_core._legacy_registry.clear()
+    _oneenv_core.clear_legacy_registry()
 
 
 # ==========================================
 # Scaffolding API Implementation
 # ==========================================
 
+class CatalogStats(NamedTuple):
+    """
+    Variable counts for one option or category
+    オプションまたはカテゴリ単位の変数数の集計
+    """
+    variables: int = 0
+    required: int = 0
+    critical: int = 0
+    important: int = 0
+    optional: int = 0
+    
+    def importance_counts(self) -> Dict[str, int]:
+        return {"critical": self.critical, "important": self.important, "optional": self.optional}
+    
+    def combine(self, other: "CatalogStats") -> "CatalogStats":
+        return CatalogStats(*(a + b for a, b in zip(self, other)))
+
+
+def _invalidating(name: str):
+    """A list method that marks the owning processor's indexes stale after it runs"""
+    method = getattr(list, name)
+    
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        owner = self._owner
+        if owner is not None:
+            owner._stale = True
+        return self if name in ("__iadd__", "__imul__") else result
+    
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+class _OptionList(list):
+    """
+    env_options list of a ScaffoldingTemplateProcessor
+    
+    Modifying it in place (append, extend, clear, item assignment, ...) marks
+    the processor's lookup indexes stale; they are rebuilt once, on the next
+    lookup, so building a catalogue item by item stays linear.
+    A list replaced by a later load is detached and no longer affects the processor.
+    """
+    
+    def __init__(self, owner: "ScaffoldingTemplateProcessor", options: Iterable[EnvOption] = ()):
+        super().__init__(options)
+        self._owner = owner
+    
+    append = _invalidating("append")
+    extend = _invalidating("extend")
+    insert = _invalidating("insert")
+    remove = _invalidating("remove")
+    pop = _invalidating("pop")
+    clear = _invalidating("clear")
+    sort = _invalidating("sort")
+    reverse = _invalidating("reverse")
+    __setitem__ = _invalidating("__setitem__")
+    __delitem__ = _invalidating("__delitem__")
+    __iadd__ = _invalidating("__iadd__")
+    __imul__ = _invalidating("__imul__")
+
+
+# Catalogue versions are unique across processor instances, so a version alone
+# identifies the catalogue a cached rendering was made from
+_catalog_versions = itertools.count(1)
+
+
 class ScaffoldingTemplateProcessor:
     """
     Scaffolding形式専用のテンプレート処理
+    
+    Plugins that advertise their category/option pairs in an oneenv.json
+    metadata file are indexed without being imported; their code is loaded
+    only when one of their categories is generated.
+    oneenv.jsonでカテゴリ/オプションを宣言したプラグインはインポートせずに索引化し、
+    そのカテゴリが生成に必要になった時点で読み込みます。
+    
+    Loading runs under a lock so that concurrent first calls load each plugin
+    once; queries read the last published snapshot without taking the lock.
+    読み込みはロック下で行い、問い合わせは公開済みのスナップショットを
+    ロックなしで参照します。
     """
     
-    def __init__(self, entry_point_group: str = "oneenv.templates"):
+    def __init__(self,
+                 entry_point_group: str = "oneenv.templates",
+                 discovery: Optional[EntryPointDiscovery] = None):
         self.entry_point_group = entry_point_group
+        self.discovery = discovery or EntryPointDiscovery(entry_point_group)
+        # Held by loaders and by the lazy index builders (reentrant: loaders nest)
+        self._lock = threading.RLock()
+        # Lookup indexes and statistics over env_options, rebuilt whenever it is assigned:
+        # category -> [EnvOption] in load order, category -> {option -> [EnvOption]}
+        self._by_category: Dict[str, List[EnvOption]] = {}
+        self._by_option: Dict[str, Dict[str, List[EnvOption]]] = {}
+        # category -> sorted option names (loaded and advertised), built on demand
+        self._structure: Optional[Dict[str, List[str]]] = None
+        # Statistics per (category, option) and per category, computed with the indexes
+        self._option_stats: Dict[str, Dict[str, CatalogStats]] = {}
+        self._category_stats: Dict[str, CatalogStats] = {}
+        # Source plugin name of each env_options entry (None when assigned directly)
+        self._option_sources: Optional[List[str]] = None
+        self._variable_index: Optional[VariableIndex] = None
+        self._search_index: Optional[SearchIndex] = None
+        # Set when env_options is modified in place; the next lookup republishes it
+        self._stale = False
         self.env_options: List[EnvOption] = []
+        # Entry-point keys in discovery order and the options each one provides
+        self._source_order: List[str] = []
+        self._source_names: Dict[str, str] = {}
+        self._options_by_source: Dict[str, List[EnvOption]] = {}
+        # Advertised but not yet imported plugins: key -> {category: [options]}
+        self._advertised: Dict[str, Dict[str, List[str]]] = {}
+        self._pending_eps: Dict[str, Any] = {}
+        self._indexed = False
     
-    def load_all_scaffolding_templates(self, debug: bool = False) -> None:
+    @property
+    def env_options(self) -> List[EnvOption]:
         """
-        インストールされた全パッケージからScaffolding形式テンプレートを読み込み
+        Loaded options in discovery order
+        
+        Assigning a new list rebuilds the lookup indexes; modifying this one in
+        place rebuilds them on the next lookup.
+        """
+        return self._env_options
+    
+    @env_options.setter
+    def env_options(self, options: List[EnvOption]) -> None:
+        self._publish(options)
+    
+    def _publish(self, options: List[EnvOption], sources: Optional[List[str]] = None) -> None:
+        """Build the indexes for `options` off to the side, then swap them in"""
+        if not (isinstance(options, _OptionList) and options._owner is self):
+            options = _OptionList(self, options)
+        by_category: Dict[str, List[EnvOption]] = {}
+        by_option: Dict[str, Dict[str, List[EnvOption]]] = {}
+        for option in options:
+            by_category.setdefault(option.category, []).append(option)
+            by_option.setdefault(option.category, {}).setdefault(option.option, []).append(option)
+        option_stats, category_stats = self._compute_stats(by_option)
+        with self._lock:
+            previous = getattr(self, "_env_options", None)
+            if previous is not None and previous is not options:
+                previous._owner = None
+            self._catalog_version = next(_catalog_versions)
+            self._stale = False
+            self._env_options = options
+            self._option_sources = sources
+            self._by_category = by_category
+            self._by_option = by_option
+            self._option_stats = option_stats
+            self._category_stats = category_stats
+            self._structure = None
+            self._variable_index = None
+            self._search_index = None
+    
+    def _republish_if_stale(self) -> None:
+        """Rebuild the indexes once after env_options was modified in place"""
+        if self._stale:
+            with self._lock:
+                if self._stale:
+                    # Sources no longer line up with a list modified in place
+                    self._publish(self._env_options)
+    
+    @staticmethod
+    def _compute_stats(by_option: Dict[str, Dict[str, List[EnvOption]]]):
+        """Count variables per option (first definition wins, as in lookups) and per category"""
+        option_stats: Dict[str, Dict[str, CatalogStats]] = {}
+        category_stats_by_name: Dict[str, CatalogStats] = {}
+        for category, options in by_option.items():
+            category_stats = CatalogStats()
+            per_option = {}
+            for option_name, env_options in options.items():
+                counts = {"critical": 0, "important": 0, "optional": 0}
+                required = 0
+                for var_config in env_options[0].env.values():
+                    counts[getattr(var_config, 'importance', 'important')] += 1
+                    required += bool(var_config.required)
+                stats = CatalogStats(len(env_options[0].env), required, **counts)
+                per_option[option_name] = stats
+                category_stats = category_stats.combine(stats)
+            option_stats[category] = per_option
+            category_stats_by_name[category] = category_stats
+        return option_stats, category_stats_by_name
+    
+    def get_variable_index(self) -> VariableIndex:
+        """
+        変数名から定義元（プラグイン、カテゴリ、オプション、重要度）への索引
+        読み込み後の最初の問い合わせで一度だけ構築
+        """
+        self._republish_if_stale()
+        index = self._variable_index
+        if index is None:
+            with self._lock:
+                if self._variable_index is None:
+                    self._variable_index = VariableIndex(
+                        location for location, _ in self._iter_locations()
+                    )
+                index = self._variable_index
+        return index
+    
+    def get_search_index(self) -> SearchIndex:
+        """
+        変数名・説明・カテゴリ・オプションの全文検索索引
+        読み込み後の最初の検索で一度だけ構築
+        """
+        self._republish_if_stale()
+        index = self._search_index
+        if index is None:
+            with self._lock:
+                if self._search_index is None:
+                    self._search_index = SearchIndex(self._iter_locations())
+                index = self._search_index
+        return index
+    
+    def _iter_locations(self):
+        """(VariableLocation, description) for every loaded variable"""
+        self._republish_if_stale()
+        options = self._env_options
+        sources = self._option_sources or [None] * len(options)
+        for option, source in zip(options, sources):
+            for var_name, var_config in option.env.items():
+                location = VariableLocation(var_name, source, option.category, option.option,
+                                            getattr(var_config, 'importance', 'important'))
+                yield location, var_config.description
+    
+    def get_option_stats(self, category: str, option: str) -> CatalogStats:
+        """
+        オプションの変数数の集計（未読み込みのオプションは0）
+        """
+        self._republish_if_stale()
+        return self._option_stats.get(category, {}).get(option, CatalogStats())
+    
+    def get_category_stats(self, category: str) -> CatalogStats:
+        """
+        カテゴリの変数数の集計（未読み込みのオプションは0）
+        """
+        self._republish_if_stale()
+        return self._category_stats.get(category, CatalogStats())
+    
+    def _get_structure(self) -> Dict[str, List[str]]:
+        """category -> sorted option names, merging loaded and advertised plugins"""
+        self._republish_if_stale()
+        cached = self._structure
+        if cached is None:
+            with self._lock:
+                if self._structure is None:
+                    structure = {category: set(options) for category, options in self._by_option.items()}
+                    # 未読み込みプラグインの宣言済み構造
+                    for advertised in self._advertised.values():
+                        for category, options in advertised.items():
+                            structure.setdefault(category, set()).update(options)
+                    self._structure = {category: sorted(options) for category, options in structure.items()}
+                cached = self._structure
+        return cached
+    
+    def find_options(self, category: str, option: Optional[str] = None) -> List[EnvOption]:
+        """
+        読み込み済みのEnvOptionを索引から取得（option省略時はカテゴリ内の全オプション）
+        """
+        self._republish_if_stale()
+        if option is None:
+            return self._by_category.get(category, [])
+        return self._by_option.get(category, {}).get(option, [])
+    
+    @property
+    def catalog_version(self) -> int:
+        """Changes whenever new options are published (load, reload, refresh, assignment)"""
+        self._republish_if_stale()
+        return self._catalog_version
+    
+    @property
+    def is_indexed(self) -> bool:
+        """Whether the category/option structure is available"""
+        return self._indexed or bool(self.env_options)
+    
+    @property
+    def is_fully_loaded(self) -> bool:
+        """Whether every plugin's variables are loaded into env_options"""
+        return self.is_indexed and not self._advertised
+    
+    def _reset(self) -> None:
+        # env_options keeps the previous snapshot until the reload publishes a new one
+        self._source_order = []
+        self._source_names = {}
+        self._options_by_source = {}
+        self._advertised = {}
+        self._pending_eps = {}
+    
+    def _convert_loaded(self, ep: LoadedEntryPoint, debug: bool = False) -> List[EnvOption]:
+        """
+        Convert one discovery result into EnvOptions (invalid formats are skipped)
+        ディスカバリ結果をEnvOptionリストに変換（不正な形式はスキップ）
         """
-        self.env_options.clear()
+        # Legacy/groups-format plugins are handled by OneEnvCore
+        if ep.kind in ("legacy", "groups", "other"):
+            return []
         
         try:
-            template_eps = entry_points(group=self.entry_point_group)
+            if ep.error is not None:
+                raise ep.error
+            template_data = ep.result
             
-            for ep in template_eps:
-                try:
-                    # Load the entry-point function
-                    template_func = ep.load()
-                    
-                    # Call the function to get template data
-                    template_data = template_func()
-                    
-                    # Scaffolding形式のみ受け入れ
-                    validate_scaffolding_format(template_data)
-                    
-                    # EnvOptionリストに変換
-                    options = scaffolding_template_function_to_env_options(ep.name, template_data)
-                    self.env_options.extend(options)
-                    
-                    if debug:
-                        print(f"✅ Loaded scaffolding template: {ep.name} ({len(options)} options)")
-                        
-                except Exception as e:
-                    # 不正な形式は無視（ログ出力）
-                    if debug:
-                        print(f"⚠️  Skipping invalid template {ep.name}: {e}")
-                        
+            # Scaffolding形式のみ受け入れ（検証とEnvOptionへの変換を一度に行う）
+            options = build_env_options(ep.name, template_data)
+            
+            if debug:
+                print(f"✅ Loaded scaffolding template: {ep.name} ({len(options)} options)")
+            return options
+                
         except Exception as e:
+            # 不正な形式は無視（ログ出力）
             if debug:
-                print(f"❌ Error discovering template plugins: {e}")
+                print(f"⚠️  Skipping invalid template {ep.name}: {e}")
+            return []
     
-    def get_template_structure(self) -> Dict[str, List[str]]:
+    def _load_sources(self, eps: List[Any], debug: bool = False) -> None:
+        """Load the given entry points and keep env_options in discovery order"""
+        if not eps:
+            return
+        for ep, loaded in zip(eps, self.discovery.load(eps, debug)):
+            self._options_by_source[entry_point_key(ep)] = self._convert_loaded(loaded, debug)
+    
+    def _sync_env_options(self) -> None:
+        self._publish(
+            [
+                option
+                for key in self._source_order
+                for option in self._options_by_source.get(key, [])
+            ],
+            [
+                self._source_names.get(key)
+                for key in self._source_order
+                for _ in self._options_by_source.get(key, [])
+            ],
+        )
+    
+    def _set_sources(self, template_eps: List[Any]) -> None:
+        self._source_order = [entry_point_key(ep) for ep in template_eps]
+        self._source_names = {
+            key: ep.name for key, ep in zip(self._source_order, template_eps)
+        }
+    
+    def _index_sources(self, template_eps: List[Any], debug: bool = False) -> None:
+        """Index advertised plugins and load the ones without metadata"""
+        unadvertised = []
+        for ep in template_eps:
+            structure = self.discovery.read_advertised_structure(ep)
+            if structure is None:
+                unadvertised.append(ep)
+            else:
+                key = entry_point_key(ep)
+                self._advertised[key] = structure
+                self._pending_eps[key] = ep
+                self._structure = None
+                if debug:
+                    print(f"📇 Indexed scaffolding template from metadata: {ep.name}")
+        
+        self._load_sources(unadvertised, debug)
+    
+    def load_all_scaffolding_templates(self, debug: bool = False) -> None:
         """
-        カテゴリ別オプション構造を返却
+        インストールされた全パッケージからScaffolding形式テンプレートを読み込み
+        読み込み済みのentry-pointはディスカバリエンジンの結果を再利用
         """
-        structure = {}
-        
-        for option in self.env_options:
-            category = option.category
-            if category not in structure:
-                structure[category] = []
+        with self._lock:
+            self._reset()
+            
+            try:
+                template_eps = list(entry_points(group=self.entry_point_group))
+                self._set_sources(template_eps)
+                self._load_sources(template_eps, debug)
+            except Exception as e:
+                if debug:
+                    print(f"❌ Error discovering template plugins: {e}")
             
-            if option.option not in structure[category]:
-                structure[category].append(option.option)
+            self._sync_env_options()
+            self._indexed = True
+    
+    def load_structure_index(self, debug: bool = False) -> None:
+        """
+        カテゴリ/オプション構造の索引を作成
+        静的メタデータを持たないプラグインのみ読み込み
+        """
+        with self._lock:
+            self._reset()
+            
+            try:
+                template_eps = list(entry_points(group=self.entry_point_group))
+                self._set_sources(template_eps)
+                self._index_sources(template_eps, debug)
+            except Exception as e:
+                if debug:
+                    print(f"❌ Error discovering template plugins: {e}")
+            
+            self._sync_env_options()
+            self._indexed = True
+    
+    def refresh(self, debug: bool = False) -> Dict[str, List[str]]:
+        """
+        インストール済みentry-pointとの差分を取り、追加・変更分のみ読み込み、
+        削除されたプラグインのオプションを破棄
+        変更（アップグレード）されたプラグインはモジュールを破棄して再インポート
+        
+        Returns:
+            {"added": [...], "changed": [...], "removed": [...]} (entry-point names)
+        """
+        with self._lock:
+            return self._refresh(debug)
+    
+    def _refresh(self, debug: bool = False) -> Dict[str, List[str]]:
+        if not self.is_indexed:
+            self.load_structure_index(debug)
+            return {"added": sorted(self._source_names.values()), "changed": [], "removed": []}
+        
+        template_eps = list(entry_points(group=self.entry_point_group))
+        known_names = dict(self._source_names)
+        known_keys = set(self._source_order)
+        self._set_sources(template_eps)
+        current_keys = set(self._source_order)
         
-        # オプションをソート
-        for category in structure:
-            structure[category].sort()
+        removed_keys = known_keys - current_keys
+        for key in removed_keys:
+            self._options_by_source.pop(key, None)
+            self._advertised.pop(key, None)
+            self._pending_eps.pop(key, None)
+        self._structure = None
+        self.discovery.forget(removed_keys)
         
-        return structure
+        new_eps = [ep for ep in template_eps if entry_point_key(ep) not in known_keys]
+        removed_names = {known_names[key] for key in removed_keys}
+        # An upgraded plugin keeps its module path; drop the old modules so it is imported again
+        dropped = unload_entry_point_modules([ep for ep in new_eps if ep.name in removed_names])
+        if debug and dropped:
+            print(f"🔄 Unloaded upgraded plugin modules: {', '.join(sorted(dropped))}")
+        self._index_sources(new_eps, debug)
+        self._sync_env_options()
+        
+        added_names = {ep.name for ep in new_eps}
+        changed = added_names & removed_names
+        result = {
+            "added": sorted(added_names - changed),
+            "changed": sorted(changed),
+            "removed": sorted(removed_names - changed),
+        }
+        if debug:
+            print(f"🔄 Refreshed scaffolding templates: {result}")
+        return result
+    
+    def load_categories(self, categories: List[str], debug: bool = False) -> None:
+        """
+        指定カテゴリを提供する未読み込みプラグインを読み込み
+        """
+        if not self._advertised:
+            return
+        wanted = set(categories)
+        with self._lock:
+            keys = [
+                key for key, structure in self._advertised.items()
+                if wanted.intersection(structure)
+            ]
+            self._load_advertised(keys, debug)
+    
+    def _load_advertised(self, keys: List[str], debug: bool = False) -> None:
+        if not keys:
+            return
+        eps = [self._pending_eps.pop(key) for key in keys]
+        self._load_sources(eps, debug)
+        self._sync_env_options()
+        # Only drop the advertisements once their options are published, so a
+        # lock-free caller never sees the category as neither pending nor loaded
+        for key in keys:
+            del self._advertised[key]
+    
+    def ensure_index(self, debug: bool = False) -> None:
+        """
+        構造の索引が未作成の場合のみ作成（同時に呼ばれても作成は一度だけ）
+        """
+        if not self.is_indexed:
+            with self._lock:
+                if not self.is_indexed:
+                    self.load_structure_index(debug)
+    
+    def ensure_loaded(self, debug: bool = False) -> None:
+        """
+        全プラグインの変数が読み込まれていることを保証（同時に呼ばれても読み込みは一度だけ）
+        """
+        if self.is_fully_loaded:
+            return
+        with self._lock:
+            if not self.is_indexed:
+                self.load_all_scaffolding_templates(debug)
+            elif self._advertised:
+                self._load_advertised(list(self._advertised), debug)
+    
+    def get_template_structure(self) -> Dict[str, List[str]]:
+        """
+        カテゴリ別オプション構造を返却
+        """
+        return {category: list(options) for category, options in self._get_structure().items()}
     
     def has_category(self, category: str) -> bool:
         """
         指定カテゴリの存在確認
         """
-        return any(option.category == category for option in self.env_options)
+        return category in self._get_structure()
     
     def get_options(self, category: str) -> List[str]:
         """
         カテゴリ内の全オプション取得
         """
-        options = []
-        for option in self.env_options:
-            if option.category == category and option.option not in options:
-                options.append(option.option)
-        return sorted(options)
+        return list(self._get_structure().get(category, []))
     
     def generate_by_selection(self, generation_range: List[Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
         """
@@ -503,29 +1049,27 @@ class ScaffoldingTemplateProcessor:
             category = selection["category"]
             option = selection.get("option")  # None = 全オプション
             
-            for env_option in self.env_options:
-                if env_option.category == category:
-                    if option is None or env_option.option == option:
-                        # 環境変数追加
-                        for var_name, var_config in env_option.env.items():
-                            # 同じ変数名が複数のオプションで定義されている場合、
-                            # オプション名をプレフィックスとして追加
-                            if option is None:  # 全オプション選択の場合
-                                unique_var_name = f"{env_option.option.upper()}_{var_name}"
-                            else:
-                                unique_var_name = var_name
-                            
-                            selected_vars[unique_var_name] = {
-                                "config": var_config,
-                                "category": env_option.category,
-                                "option": env_option.option
-                            }
+            for env_option in self.find_options(category, option):
+                # 環境変数追加
+                for var_name, var_config in env_option.env.items():
+                    # 同じ変数名が複数のオプションで定義されている場合、
+                    # オプション名をプレフィックスとして追加
+                    if option is None:  # 全オプション選択の場合
+                        unique_var_name = f"{env_option.option.upper()}_{var_name}"
+                    else:
+                        unique_var_name = var_name
+                    
+                    selected_vars[unique_var_name] = {
+                        "config": var_config,
+                        "category": env_option.category,
+                        "option": env_option.option
+                    }
         
         return selected_vars
 
 
 # Global scaffolding processor instance
-_scaffolding_processor = ScaffoldingTemplateProcessor()
+_scaffolding_processor = ScaffoldingTemplateProcessor(discovery=_entry_point_discovery)
 
 
 def get_all_template_structure() -> Dict[str, List[str]]:
@@ -546,12 +1090,31 @@ def get_all_template_structure() -> Dict[str, List[str]]:
         ImportError: entry-pointsの読み込みに失敗した場合
         ValueError: 不正なScaffolding形式テンプレートが見つかった場合
     """
-    # テンプレートが既に読み込まれていない場合のみ読み込み
-    if not _scaffolding_processor.env_options:
-        _scaffolding_processor.load_all_scaffolding_templates()
+    # 索引が未作成の場合のみ作成（メタデータで宣言済みのプラグインはインポートしない）
+    _scaffolding_processor.ensure_index()
     return _scaffolding_processor.get_template_structure()
 
 
+def refresh_templates(debug: bool = False) -> Dict[str, List[str]]:
+    """
+    インストール済みプラグインの変更をグローバルなテンプレートカタログに反映
+    
+    追加・変更されたentry-pointのみ読み込み、削除されたものは破棄します。
+    変更されたプラグインのモジュールはsys.modulesから破棄して再インポートします。
+    長時間稼働するプロセスで新しくインストールされたプラグインを取り込む場合に使用します。
+    
+    Returns:
+        {"added": [...], "changed": [...], "removed": [...]} (entry-point names)
+    
+    Example:
+        >>> refresh_templates()
+        {'added': ['redis'], 'changed': [], 'removed': []}
+    """
+    changes = _scaffolding_processor.refresh(debug=debug)
+    _render_cache.clear()
+    return changes
+
+
 def has_category(category: str) -> bool:
     """
     指定されたカテゴリが利用可能かどうかを確認
@@ -578,9 +1141,8 @@ def has_category(category: str) -> bool:
     if not category.strip():
         raise ValueError("Category cannot be empty")
     
-    # テンプレートが既に読み込まれていない場合のみ読み込み
-    if not _scaffolding_processor.env_options:
-        _scaffolding_processor.load_all_scaffolding_templates()
+    # 索引が未作成の場合のみ作成
+    _scaffolding_processor.ensure_index()
     return _scaffolding_processor.has_category(category.strip())
 
 
@@ -610,9 +1172,8 @@ def get_options(category: str) -> List[str]:
     if not category.strip():
         raise ValueError("Category cannot be empty")
     
-    # テンプレートが既に読み込まれていない場合のみ読み込み
-    if not _scaffolding_processor.env_options:
-        _scaffolding_processor.load_all_scaffolding_templates()
+    # 索引が未作成の場合のみ作成
+    _scaffolding_processor.ensure_index()
     
     # カテゴリが存在しない場合、利用可能なカテゴリを提案
     if not _scaffolding_processor.has_category(category.strip()):
@@ -625,6 +1186,123 @@ def get_options(category: str) -> List[str]:
     return _scaffolding_processor.get_options(category.strip())
 
 
+# Indexes that also cover legacy templates: kind -> ((catalog version, legacy version), index)
+_catalog_indexes: Dict[str, tuple] = {}
+_catalog_indexes_lock = threading.Lock()
+
+
+def _build_legacy_variable_index(records: Dict[str, Dict[str, Any]]) -> VariableIndex:
+    return VariableIndex(
+        VariableLocation(var_name, source, None, None, info["config"].importance)
+        for var_name, info in records.items()
+        for source in info["sources"]
+    )
+
+
+def _build_combined_search_index(records: Dict[str, Dict[str, Any]]) -> SearchIndex:
+    # One corpus, so that scores of scaffolding and legacy hits are comparable
+    legacy_documents = (
+        (VariableLocation(var_name, ", ".join(info["sources"]), None, None, info["config"].importance),
+         info["config"].description)
+        for var_name, info in records.items()
+    )
+    return SearchIndex(itertools.chain(_scaffolding_processor._iter_locations(), legacy_documents))
+
+
+def _get_catalog_index(kind: str, build: Callable[[Dict[str, Dict[str, Any]]], Any]) -> Any:
+    """
+    スキャフォールディングカタログとレガシーテンプレートにまたがる索引を返す
+    どちらかが変更された場合のみ再構築
+    """
+    # Versions are read first: if the records change meanwhile, the next call rebuilds
+    versions = (_scaffolding_processor.catalog_version, _oneenv_core.legacy_version)
+    records = _oneenv_core.get_legacy_records()
+    cached = _catalog_indexes.get(kind)
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+    with _catalog_indexes_lock:
+        cached = _catalog_indexes.get(kind)
+        if cached is None or cached[0] != versions:
+            cached = _catalog_indexes[kind] = (versions, build(records))
+        return cached[1]
+
+
+def find_variable(name: str, prefix: bool = False, include_legacy: bool = True) -> List[VariableLocation]:
+    """
+    環境変数を定義しているプラグイン・カテゴリ・オプションを検索
+    
+    Args:
+        name: 環境変数名（prefix=Trueの場合は接頭辞）
+        prefix: 前方一致で検索するかどうか
+        include_legacy: @oneenvデコレータやレガシー形式プラグインのテンプレートも検索するかどうか
+        
+    Returns:
+        VariableLocation(variable, source, category, option, importance)のリスト
+        （スキャフォールディング形式の定義が先、レガシー形式はcategory/optionがNone）
+        
+    Example:
+        >>> find_variable("REDIS_URL")
+        [VariableLocation(variable='REDIS_URL', source='redis', category='Cache', option='redis', importance='important')]
+        >>> [loc.variable for loc in find_variable("REDIS_", prefix=True)]
+        ['REDIS_PASSWORD', 'REDIS_URL']
+    
+    Raises:
+        TypeError: nameが文字列でない場合
+        ValueError: nameが空文字列の場合
+    """
+    if not isinstance(name, str):
+        raise TypeError(f"Variable name must be string, got {type(name)}")
+    
+    if not name.strip():
+        raise ValueError("Variable name cannot be empty")
+    
+    name = name.strip()
+    _scaffolding_processor.ensure_loaded()
+    indexes = [_scaffolding_processor.get_variable_index()]
+    if include_legacy:
+        indexes.append(_get_catalog_index("legacy_variables", _build_legacy_variable_index))
+    
+    results = []
+    for index in indexes:
+        results.extend(index.lookup_prefix(name) if prefix else index.lookup(name))
+    return results
+
+
+def search_templates(query: str, limit: Optional[int] = 20,
+                     include_legacy: bool = True) -> List[SearchResult]:
+    """
+    変数名・説明・カテゴリ・オプションを全文検索し、関連度順に返却
+    
+    Args:
+        query: 検索語（すべての語に一致する変数を返す。語の前方一致も可）
+        limit: 返却する最大件数（Noneで無制限）
+        include_legacy: @oneenvデコレータやレガシー形式プラグインのテンプレートも検索するかどうか
+        
+    Returns:
+        SearchResult(score, location, description)のリスト（スコアの高い順）
+        
+    Example:
+        >>> [(r.location.category, r.location.variable) for r in search_templates("connection pool")]
+        [('Database', 'DATABASE_POOL_SIZE')]
+    
+    Raises:
+        TypeError: queryが文字列でない場合
+        ValueError: queryが空文字列の場合
+    """
+    if not isinstance(query, str):
+        raise TypeError(f"Query must be string, got {type(query)}")
+    
+    if not query.strip():
+        raise ValueError("Query cannot be empty")
+    
+    _scaffolding_processor.ensure_loaded()
+    if include_legacy:
+        index = _get_catalog_index("search", _build_combined_search_index)
+    else:
+        index = _scaffolding_processor.get_search_index()
+    return index.search(query, limit=limit)
+
+
 def generate_env_file_content(variables: Dict[str, Dict[str, Any]]) -> str:
     """
     環境変数辞書から.envファイル内容を生成
@@ -639,8 +1317,19 @@ def generate_env_file_content(variables: Dict[str, Dict[str, Any]]) -> str:
             }
         }
     """
-    lines = []
-    
+    return "".join(iter_env_file_content(variables))
+
+
+def iter_env_file_content(variables: Dict[str, Dict[str, Any]]) -> Iterator[str]:
+    """
+    .envファイル内容をチャンクのストリームとして生成
+    連結した結果はgenerate_env_file_content()と完全に一致
+    """
+    return iter_joined_lines(_iter_env_file_lines(variables))
+
+
+def _iter_env_file_lines(variables: Dict[str, Dict[str, Any]]) -> Iterator[str]:
+    """Lines of the .env file, without line terminators"""
     # 重要度別にグループ化
     importance_groups = {"critical": {}, "important": {}, "optional": {}}
     
@@ -668,69 +1357,133 @@ def generate_env_file_content(variables: Dict[str, Dict[str, Any]]) -> str:
             
         # 重要度セクションヘッダー
         if importance == "critical":
-            lines.append("# ========== CRITICAL: Essential Settings for Application Operation ==========")
+            yield "# ========== CRITICAL: Essential Settings for Application Operation =========="
         elif importance == "important":
-            lines.append("# ========== IMPORTANT: Settings to Configure for Production Use ==========")
+            yield "# ========== IMPORTANT: Settings to Configure for Production Use =========="
         else:  # optional
-            lines.append("# ========== OPTIONAL: Fine-tuning Settings (Defaults are Sufficient) ==========")
-        lines.append("")
+            yield "# ========== OPTIONAL: Fine-tuning Settings (Defaults are Sufficient) =========="
+        yield ""
         
         # カテゴリ/オプション別に出力
         for group_name, group_vars in sorted(importance_groups[importance].items()):
-            lines.append(f"# ----- {group_name} -----")
-            lines.append("")
+            yield f"# ----- {group_name} -----"
+            yield ""
             
             for var_name, var_info in sorted(group_vars):
                 config = var_info["config"]
                 
                 # コメント行（説明）
                 if hasattr(config, 'description') and config.description:
-                    lines.append(f"# {config.description}")
+                    yield f"# {config.description}"
                 
                 # 必須マーカー
                 if hasattr(config, 'required') and config.required:
-                    lines.append("# Required")
+                    yield "# Required"
                 
                 # 選択肢
                 if hasattr(config, 'choices') and config.choices:
-                    lines.append(f"# Choices: {', '.join(config.choices)}")
+                    yield f"# Choices: {', '.join(config.choices)}"
                 
                 # 変数行
                 default_value = getattr(config, 'default', '')
-                lines.append(f"{var_name}={default_value}")
-                lines.append("")
+                yield f"{var_name}={default_value}"
+                yield ""
             
-            lines.append("")  # グループ間の空行
-    
-    return "\n".join(lines)
+            yield ""  # グループ間の空行
+
+
+# Number of renderings kept by generate_template()
+RENDER_CACHE_SIZE = 128
 
 
-def generate_template(dest: str, generation_range: List[Dict[str, str]]) -> str:
+class RenderCacheInfo(NamedTuple):
+    """Render cache statistics (as functools.lru_cache's cache_info())"""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class RenderCache:
+    """
+    LRU cache of rendered .env content keyed by (catalogue version, selection)
+    （カタログのバージョン, 選択範囲）をキーとする描画済み.env内容のLRUキャッシュ
     """
-    指定された選択範囲に基づいて.envテンプレートファイルを生成
     
-    Args:
-        dest: 出力先ファイルパス（空文字列の場合はファイル出力なし）
-        generation_range: 生成範囲指定のリスト
-            [
-                {"category": "Database", "option": "postgres"},     # 特定オプション
-                {"category": "VectorStore", "option": "chroma"},    # 特定オプション  
-                {"category": "LLM"}                                 # 全オプション
-            ]
+    def __init__(self, maxsize: int = RENDER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Any, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
     
-    Returns:
-        生成された.envファイルの内容（文字列）
+    def get(self, key: Any) -> Optional[str]:
+        with self._lock:
+            content = self._entries.get(key)
+            if content is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return content
     
-    Raises:
-        TypeError: 引数の型が不正な場合
-        ValueError: generation_rangeの形式が不正な場合
-        FileNotFoundError: destの親ディレクトリが存在しない場合
-        PermissionError: destファイルに書き込み権限がない場合
+    def put(self, key: Any, content: str) -> None:
+        with self._lock:
+            self._entries[key] = content
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = 0
+    
+    def info(self) -> RenderCacheInfo:
+        with self._lock:
+            return RenderCacheInfo(self._hits, self._misses, self.maxsize, len(self._entries))
+
+
+_render_cache = RenderCache()
+
+
+def get_render_cache_info() -> RenderCacheInfo:
     """
-    # 引数検証
-    if not isinstance(dest, str):
-        raise TypeError(f"dest must be string, got {type(dest)}")
+    generate_template()の描画キャッシュの統計（ヒット数、ミス数、最大サイズ、現在のサイズ）
+    """
+    return _render_cache.info()
+
+
+def clear_render_cache() -> None:
+    """
+    generate_template()の描画キャッシュと統計をクリア
+    （カタログの再読み込み時はバージョンが変わるため、明示的なクリアは不要）
+    """
+    _render_cache.clear()
+
+
+def _render_cache_key(generation_range: Any) -> Optional[tuple]:
+    """
+    ((category, option or None), ...) for a well-formed range, else None (not cached)
     
+    Values are kept as given, not stripped: generate_by_selection() looks them up
+    verbatim, so " Database" and "Database" do not render the same.
+    """
+    if not isinstance(generation_range, list):
+        return None
+    key = []
+    for selection in generation_range:
+        if not isinstance(selection, dict) or not isinstance(selection.get("category"), str):
+            return None
+        option = selection.get("option")
+        if "option" in selection and not isinstance(option, str):
+            return None
+        key.append((selection["category"], option))
+    return tuple(key)
+
+
+def _select_variables(generation_range: List[Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+    """Validate generation_range, load the plugins it needs and select its variables"""
     if not isinstance(generation_range, list):
         raise TypeError(f"generation_range must be list, got {type(generation_range)}")
     
@@ -750,24 +1503,76 @@ def generate_template(dest: str, generation_range: List[Dict[str, str]]) -> str:
                 raise ValueError(f"generation_range[{i}]['option'] must be non-empty string if provided")
     
     # テンプレート読み込み・生成
-    # テンプレートが既に読み込まれていない場合のみ読み込み
-    if not _scaffolding_processor.env_options:
-        _scaffolding_processor.load_all_scaffolding_templates()
+    # 索引が未作成の場合のみ作成
+    _scaffolding_processor.ensure_index()
     
     # カテゴリ存在チェック
-    available_categories = list(_scaffolding_processor.get_template_structure().keys())
     for i, selection in enumerate(generation_range):
         category = selection["category"].strip()
         if not _scaffolding_processor.has_category(category):
+            available_categories = list(_scaffolding_processor.get_template_structure().keys())
             if available_categories:
                 raise ValueError(f"generation_range[{i}]: Category '{category}' not found. Available categories: {', '.join(sorted(available_categories))}")
             else:
                 raise ValueError(f"generation_range[{i}]: Category '{category}' not found. No scaffolding templates are currently available.")
     
-    selected_vars = _scaffolding_processor.generate_by_selection(generation_range)
+    # 選択されたカテゴリを提供するプラグインのみ読み込み
+    _scaffolding_processor.load_categories(
+        [selection["category"].strip() for selection in generation_range]
+    )
+    
+    return _scaffolding_processor.generate_by_selection(generation_range)
+
+
+def generate_template(dest: str, generation_range: List[Dict[str, str]],
+                      skip_unchanged: bool = False) -> str:
+    """
+    指定された選択範囲に基づいて.envテンプレートファイルを生成
+    
+    Args:
+        dest: 出力先ファイルパス（空文字列の場合はファイル出力なし）
+        generation_range: 生成範囲指定のリスト
+            [
+                {"category": "Database", "option": "postgres"},     # 特定オプション
+                {"category": "VectorStore", "option": "chroma"},    # 特定オプション  
+                {"category": "LLM"}                                 # 全オプション
+            ]
+        skip_unchanged: 内容が同じ場合はdestを書き換えない（書き込む場合は一時ファイル経由でアトミックに置換）
+    
+    Returns:
+        生成された.envファイルの内容（文字列）
     
-    # .envファイル内容生成
-    env_content = generate_env_file_content(selected_vars)
+    描画結果は選択範囲とカタログのバージョンをキーとしてLRUキャッシュされ、
+    同じ選択範囲の2回目以降の呼び出しでは検証・描画を省略します
+    （get_render_cache_info() / clear_render_cache() を参照）。
+    
+    Raises:
+        TypeError: 引数の型が不正な場合
+        ValueError: generation_rangeの形式が不正な場合
+        FileNotFoundError: destの親ディレクトリが存在しない場合
+        PermissionError: destファイルに書き込み権限がない場合
+    """
+    # 引数検証
+    if not isinstance(dest, str):
+        raise TypeError(f"dest must be string, got {type(dest)}")
+    
+    # 描画キャッシュの参照（成功した描画のみ保存されるため、ヒットしたキーは検証済み）
+    range_key = _render_cache_key(generation_range)
+    env_content = None
+    if range_key is not None:
+        _scaffolding_processor.ensure_index()
+        version = _scaffolding_processor.catalog_version
+        env_content = _render_cache.get((version, range_key))
+    
+    if env_content is None:
+        selected_vars = _select_variables(generation_range)
+        
+        # .envファイル内容生成
+        env_content = generate_env_file_content(selected_vars)
+        
+        # 描画中にカタログが更新された場合（プラグインの遅延読み込みなど）は保存しない
+        if range_key is not None and _scaffolding_processor.catalog_version == version:
+            _render_cache.put((version, range_key), env_content)
     
     # ファイル出力
     if dest.strip():
@@ -778,14 +1583,78 @@ def generate_template(dest: str, generation_range: List[Dict[str, str]]) -> str:
             if parent_dir and not os.path.exists(parent_dir):
                 raise FileNotFoundError(f"Parent directory does not exist: {parent_dir}")
             
-            with open(dest, 'w', encoding='utf-8') as f:
-                f.write(env_content)
+            if skip_unchanged:
+                write_text(dest, env_content)
+            else:
+                with open(dest, 'w', encoding='utf-8') as f:
+                    f.write(env_content)
         except (IOError, OSError) as e:
             raise PermissionError(f"Cannot write to file {dest}: {e}")
     
     return env_content
 
 
+def write_template(dest: str, generation_range: List[Dict[str, str]],
+                   skip_unchanged: bool = True) -> bool:
+    """
+    generate_template()と同じ内容をdestにアトミックに書き込み、変更があったかを返す
+    
+    内容はチャンク単位で一時ファイルに書き込んでから置換するため、メモリ使用量は一定で、
+    読み込み側が書きかけのファイルを見ることはありません。
+    
+    Args:
+        dest: 出力先ファイルパス
+        generation_range: 生成範囲指定のリスト（generate_template()と同じ形式）
+        skip_unchanged: 内容が同じ場合はdestを書き換えない（mtimeも変わらない）
+    
+    Returns:
+        ファイルを書き込んだ場合True、内容が同じで書き込まなかった場合False
+    
+    Raises:
+        TypeError: 引数の型が不正な場合
+        ValueError: generation_rangeの形式が不正な場合
+        FileNotFoundError: destの親ディレクトリが存在しない場合
+        PermissionError: destファイルに書き込み権限がない場合
+    """
+    if not isinstance(dest, str) or not dest.strip():
+        raise TypeError(f"dest must be a non-empty string, got {dest!r}")
+    
+    selected_vars = _select_variables(generation_range)
+    
+    parent_dir = os.path.dirname(dest)
+    if parent_dir and not os.path.exists(parent_dir):
+        raise FileNotFoundError(f"Parent directory does not exist: {parent_dir}")
+    try:
+        return write_text(dest, iter_env_file_content(selected_vars), skip_unchanged=skip_unchanged)
+    except OSError as e:
+        raise PermissionError(f"Cannot write to file {dest}: {e}")
+
+
+def stream_template(fp: TextIO, generation_range: List[Dict[str, str]]) -> int:
+    """
+    generate_template()と同じ内容を、開いているテキストファイル（またはソケットの
+    makefile('w')など、write()を持つオブジェクト）にチャンク単位で書き込む
+    
+    内容全体をメモリ上に構築しないため、大きなリファレンスファイルでもメモリ使用量が一定
+    
+    Args:
+        fp: 書き込み先（write(str)を持つオブジェクト）
+        generation_range: 生成範囲指定のリスト（generate_template()と同じ形式）
+    
+    Returns:
+        書き込んだ文字数
+    
+    Raises:
+        TypeError: 引数の型が不正な場合
+        ValueError: generation_rangeの形式が不正な場合
+    """
+    written = 0
+    for chunk in iter_env_file_content(_select_variables(generation_range)):
+        fp.write(chunk)
+        written += len(chunk)
+    return written
+
+
 def collect_all_options(debug: bool = False) -> Dict[str, Dict[str, Any]]:
     """
     Collect all available options from scaffolding templates organized by category
@@ -809,8 +1678,7 @@ def collect_all_options(debug: bool = False) -> Dict[str, Dict[str, Any]]:
         }
     """
     # Load scaffolding templates if not already loaded
-    if not _scaffolding_processor.env_options:
-        _scaffolding_processor.load_all_scaffolding_templates(debug=debug)
+    _scaffolding_processor.ensure_loaded(debug=debug)
     
     # Organize by category
     categories = {}
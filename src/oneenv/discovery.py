@@ -0,0 +1,605 @@
+"""
+OneEnv Entry-point Discovery
+Entry-pointsからのテンプレート読み込み
+
+Loads and calls the template functions registered under an entry-point group.
+Plugins can be loaded concurrently on a bounded pool of threads with a
+per-plugin timeout (ONEENV_DISCOVERY_WORKERS / ONEENV_PLUGIN_TIMEOUT).
+Template functions may be coroutine functions (`async def`); their
+coroutines are awaited together on one event loop.
+テンプレート関数はコルーチン関数（async def）でもよく、
+そのコルーチンは1つのイベントループ上でまとめて実行されます。
+When ONEENV_CACHE_DIR is set, the raw template data is kept in a persistent
+registry cache keyed by a fingerprint of the installed distributions, so a
+warm run rebuilds templates without importing any plugin module.
+ONEENV_CACHE_DIRが設定されている場合、テンプレートデータをインストール済み
+ディストリビューションのフィンガープリントをキーとして永続キャッシュに保存し、
+2回目以降はプラグインモジュールをインポートせずにテンプレートを再構築します。
+"""
+
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Handle different Python versions for importlib.metadata
+if sys.version_info < (3, 10):
+    from importlib_metadata import distributions
+else:
+    from importlib.metadata import distributions
+
+from .cache import get_cache_dir, read_json_cache, write_json_cache
+
+# Static category/option metadata shipped next to a plugin's template module
+METADATA_FILENAME = "oneenv.json"
+
+# Bump when the layout of the cache file changes
+REGISTRY_CACHE_VERSION = 1
+
+WORKERS_ENV = "ONEENV_DISCOVERY_WORKERS"
+TIMEOUT_ENV = "ONEENV_PLUGIN_TIMEOUT"
+
+
+class LoadedEntryPoint(NamedTuple):
+    """
+    Result of loading and calling one entry-point template function
+    1つのentry-pointテンプレート関数の読み込み・呼び出し結果
+    """
+    name: str
+    result: Any
+    error: Optional[BaseException]
+    cached: bool = False
+
+    @property
+    def kind(self) -> str:
+        """
+        Template format: "scaffolding" (list of options), "groups" (dict with a
+        "groups" key), "legacy" (flat dict), "other" or "error"
+        テンプレート形式を返す
+        """
+        if self.error is not None:
+            return "error"
+        if isinstance(self.result, list):
+            return "scaffolding"
+        if isinstance(self.result, dict):
+            return "groups" if "groups" in self.result else "legacy"
+        return "other"
+
+
+def entry_point_key(ep: Any) -> str:
+    """
+    Stable identifier of an entry point ("name=module:attr@dist==version")
+    entry-pointの識別子（"name=module:attr@dist==version"）
+
+    The providing distribution's version is included so that upgrading a
+    plugin is seen as a change even when its entry point value is unchanged.
+    """
+    key = f"{ep.name}={getattr(ep, 'value', '')}"
+    dist = getattr(ep, "dist", None)
+    if dist is not None:
+        try:
+            key += f"@{dist.name}=={dist.version}"
+        except Exception:
+            pass
+    return key
+
+
+def _distribution_stamp(dist: Any) -> str:
+    """Identify a distribution by its metadata path and RECORD/metadata mtime"""
+    path = getattr(dist, "_path", None)
+    if path is None:
+        return f"{dist.metadata['Name']}=={dist.version}"
+    for name in ("RECORD", "METADATA", "PKG-INFO"):
+        try:
+            stat = os.stat(os.path.join(str(path), name))
+            return f"{path}:{name}:{stat.st_mtime_ns}:{stat.st_size}"
+        except OSError:
+            continue
+    try:
+        return f"{path}:{os.stat(str(path)).st_mtime_ns}"
+    except OSError:
+        return str(path)
+
+
+def distributions_fingerprint() -> str:
+    """
+    Fingerprint of the installed distributions (name, version, metadata mtime)
+    インストール済みディストリビューションのフィンガープリントを計算
+
+    The distribution name and version are part of the metadata directory name,
+    so only a stat() per distribution is needed.
+    """
+    stamps = sorted(_distribution_stamp(dist) for dist in distributions())
+    digest = hashlib.sha256(f"{REGISTRY_CACHE_VERSION}:{sys.version}".encode("utf-8"))
+    for stamp in stamps:
+        digest.update(stamp.encode("utf-8", "surrogateescape"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _split_entry_point_value(ep: Any) -> Optional[Tuple[str, str]]:
+    """Split "module:attr [extras]" into (module, attr) without importing"""
+    value = getattr(ep, "value", None)
+    if not isinstance(value, str):
+        return None
+    module, _, attr = value.split("[", 1)[0].partition(":")
+    module = module.strip()
+    if not module:
+        return None
+    return module, attr.strip()
+
+
+def find_package_dir(module: str) -> Optional[str]:
+    """
+    Locate the regular package providing a module on sys.path without importing it
+    モジュールを提供する通常パッケージのディレクトリをインポートせずに探す
+
+    A package is its own directory; a submodule gives its parent package's
+    directory. Top-level single-file modules and namespace packages have no
+    directory of their own (a sys.path entry is shared by every module on it),
+    so None is returned for them.
+    """
+    parts = module.split(".")
+    for entry in sys.path:
+        base = os.path.join(os.path.abspath(entry or os.curdir), *parts)
+        if os.path.isfile(os.path.join(base, "__init__.py")):
+            return base
+        if os.path.isfile(base + ".py"):
+            parent = os.path.dirname(base)
+            if len(parts) > 1 and os.path.isfile(os.path.join(parent, "__init__.py")):
+                return parent
+            return None
+    return None
+
+
+def _read_metadata_file(ep: Any, module: str) -> Optional[Any]:
+    """Read oneenv.json from the providing distribution, else from the package directory"""
+    dist = getattr(ep, "dist", None)
+    if dist is not None:
+        try:
+            text = dist.read_text(METADATA_FILENAME)
+        except Exception:
+            text = None
+        if isinstance(text, str):
+            try:
+                return json.loads(text)
+            except ValueError:
+                return None
+
+    directory = find_package_dir(module)
+    if directory is None:
+        return None
+    return read_json_cache(os.path.join(directory, METADATA_FILENAME))
+
+
+def read_advertised_structure(ep: Any) -> Optional[Dict[str, List[str]]]:
+    """
+    Read the category/option pairs a plugin declares in its metadata file
+    プラグインのメタデータファイルで宣言されたカテゴリ/オプションを読み込む
+
+    The file is "oneenv.json" in the .dist-info directory of the distribution
+    providing the entry point or, failing that, in the regular package holding
+    the entry point's module. It is keyed by the template function name:
+
+        {"templates": {"database_template": {"Database": ["sqlite", "postgres"]}}}
+
+    Returns:
+        {category: [options]} or None if the plugin declares nothing usable
+    """
+    target = _split_entry_point_value(ep)
+    if target is None:
+        return None
+    module, attr = target
+
+    data = _read_metadata_file(ep, module)
+    templates = data.get("templates") if isinstance(data, dict) else None
+    if not isinstance(templates, dict):
+        return None
+    declared = templates.get(attr or ep.name)
+    if not isinstance(declared, dict) or not declared:
+        return None
+
+    structure = {}
+    for category, options in declared.items():
+        if (not isinstance(category, str) or not category.strip()
+                or not isinstance(options, list) or not options
+                or not all(isinstance(o, str) and o.strip() for o in options)):
+            return None
+        structure[category.strip()] = sorted({o.strip() for o in options})
+    return structure
+
+
+def unload_entry_point_modules(eps: Iterable[Any]) -> List[str]:
+    """
+    Drop the modules of the given entry points from sys.modules
+    entry-pointのモジュールをsys.modulesから破棄する
+
+    ep.load() imports through sys.modules, so an upgraded plugin would keep
+    serving its old template function until its modules are dropped. The whole
+    top-level package is dropped, as the template module may import siblings.
+
+    Returns:
+        The names of the dropped modules
+    """
+    packages = set()
+    for ep in eps:
+        target = _split_entry_point_value(ep)
+        if target is not None:
+            packages.add(target[0].split(".")[0])
+    # Never unload oneenv itself
+    packages.discard(__name__.split(".")[0])
+    if not packages:
+        return []
+
+    dropped = [name for name in list(sys.modules) if name.split(".")[0] in packages]
+    for name in dropped:
+        sys.modules.pop(name, None)
+    if dropped:
+        import importlib
+        importlib.invalidate_caches()
+    return dropped
+
+
+def _is_json_serializable(value: Any) -> bool:
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+class RegistryCache:
+    """
+    Persistent cache of raw entry-point template data
+    entry-pointテンプレートデータの永続キャッシュ
+    """
+
+    def __init__(self, cache_dir: str, group: str):
+        self.cache_dir = cache_dir
+        self.group = group
+
+    @property
+    def path(self) -> str:
+        safe_group = "".join(c if c.isalnum() or c in "-_." else "_" for c in self.group)
+        return os.path.join(self.cache_dir, f"registry-{safe_group}.json")
+
+    def load(self, fingerprint: str) -> Dict[str, Any]:
+        """
+        Return cached template data, or an empty dict if the cache is stale
+        キャッシュ済みデータを返す（フィンガープリント不一致の場合は空辞書）
+        """
+        data = read_json_cache(self.path)
+        if not isinstance(data, dict) or data.get("fingerprint") != fingerprint:
+            return {}
+        entries = data.get("entries")
+        return entries if isinstance(entries, dict) else {}
+
+    def save(self, fingerprint: str, entries: Dict[str, Any]) -> bool:
+        """
+        Replace the cache contents
+        キャッシュ内容を置き換える
+        """
+        return write_json_cache(self.path, {
+            "version": REGISTRY_CACHE_VERSION,
+            "fingerprint": fingerprint,
+            "entries": entries,
+        })
+
+
+def _env_number(name: str, convert: Callable[[str], Any]) -> Optional[Any]:
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return None
+    try:
+        return convert(value)
+    except ValueError:
+        print(f"OneEnv: ignoring invalid {name}={value!r}", file=sys.stderr)
+        return None
+
+
+def _load_and_call(ep: Any) -> Any:
+    """Load the entry-point function and call it to get template data (or a coroutine)"""
+    template_func = ep.load()
+    return template_func()
+
+
+def _is_awaitable(value: Any) -> bool:
+    # Checked on the type, as inspect.isawaitable() does, without importing asyncio/inspect
+    return hasattr(type(value), "__await__")
+
+
+def _gather_awaitables(eps: List[Any],
+                       awaitables: List[Any],
+                       timeout: Optional[float]) -> List[Tuple[Any, Optional[BaseException]]]:
+    """
+    Await the coroutines returned by async template functions concurrently
+    非同期テンプレート関数が返したコルーチンを1つのイベントループ上で並行実行
+
+    Each one gets its own `timeout`; outcomes are returned in input order.
+    """
+    import asyncio
+
+    async def await_one(ep: Any, awaitable: Any) -> Tuple[Any, Optional[BaseException]]:
+        try:
+            if timeout is None:
+                return await awaitable, None
+            return await asyncio.wait_for(awaitable, timeout), None
+        except asyncio.TimeoutError:
+            return None, TimeoutError(
+                f"Template plugin {ep.name} did not finish within {timeout:g}s"
+            )
+        except Exception as e:
+            return None, e
+
+    async def gather_all() -> List[Tuple[Any, Optional[BaseException]]]:
+        return list(await asyncio.gather(*(
+            await_one(ep, awaitable) for ep, awaitable in zip(eps, awaitables)
+        )))
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(gather_all())
+
+    # Discovery was called synchronously from a coroutine: this thread's loop
+    # is busy, so run a private loop on a helper thread and wait for it
+    outcomes: List[Any] = []
+    runner = threading.Thread(target=lambda: outcomes.extend(asyncio.run(gather_all())),
+                              name="oneenv-discovery", daemon=True)
+    runner.start()
+    runner.join()
+    return outcomes
+
+
+def _resolve_awaitables(eps: List[Any],
+                        outcomes: List[Tuple[Any, Optional[BaseException]]],
+                        timeout: Optional[float]) -> List[Tuple[Any, Optional[BaseException]]]:
+    """Replace coroutine results with their awaited values"""
+    pending = [index for index, (result, error) in enumerate(outcomes)
+               if error is None and _is_awaitable(result)]
+    if not pending:
+        return outcomes
+    outcomes = list(outcomes)
+    awaited = _gather_awaitables([eps[index] for index in pending],
+                                 [outcomes[index][0] for index in pending], timeout)
+    for index, outcome in zip(pending, awaited):
+        outcomes[index] = outcome
+    return outcomes
+
+
+def _load_serially(eps: List[Any]) -> List[Tuple[Any, Optional[BaseException]]]:
+    outcomes = []
+    for ep in eps:
+        try:
+            outcomes.append((_load_and_call(ep), None))
+        except Exception as e:
+            outcomes.append((None, e))
+    return outcomes
+
+
+def _load_concurrently(eps: List[Any],
+                       max_workers: int,
+                       timeout: Optional[float]) -> List[Tuple[Any, Optional[BaseException]]]:
+    """
+    Load entry points on a bounded pool of daemon threads
+    デーモンスレッドの制限付きプールでentry-pointを並行読み込み
+
+    Outcomes are returned in entry-point order. A plugin that runs longer than
+    `timeout` seconds (measured from when it started) is reported as a
+    TimeoutError; its thread is abandoned and replaced so the remaining plugins
+    keep the full pool. Daemon threads are used so a hung plugin cannot keep
+    the interpreter alive at exit.
+    """
+    count = len(eps)
+    outcomes: List[Any] = [None] * count
+    start_times = [0.0] * count
+    started = [threading.Event() for _ in range(count)]
+    finished = [threading.Event() for _ in range(count)]
+    pending: "queue.SimpleQueue[int]" = queue.SimpleQueue()
+    for index in range(count):
+        pending.put(index)
+
+    def worker() -> None:
+        while True:
+            try:
+                index = pending.get_nowait()
+            except queue.Empty:
+                return
+            start_times[index] = time.monotonic()
+            started[index].set()
+            try:
+                outcomes[index] = (_load_and_call(eps[index]), None)
+            except BaseException as e:
+                outcomes[index] = (None, e)
+            finished[index].set()
+
+    def spawn_worker() -> None:
+        threading.Thread(target=worker, name="oneenv-discovery", daemon=True).start()
+
+    for _ in range(min(max_workers, count)):
+        spawn_worker()
+
+    results = []
+    for index, ep in enumerate(eps):
+        if timeout is None:
+            finished[index].wait()
+        else:
+            # Tasks are taken in order, so every earlier task has either
+            # finished or had its worker replaced: this one will start.
+            started[index].wait()
+            remaining = start_times[index] + timeout - time.monotonic()
+            if not finished[index].wait(max(remaining, 0.0)):
+                results.append((None, TimeoutError(
+                    f"Template plugin {ep.name} did not finish within {timeout:g}s"
+                )))
+                spawn_worker()
+                continue
+        results.append(outcomes[index])
+    return results
+
+
+def load_entry_point_results(eps: Iterable[Any],
+                             group: str = "oneenv.templates",
+                             debug: bool = False,
+                             max_workers: Optional[int] = None,
+                             timeout: Optional[float] = None) -> List[LoadedEntryPoint]:
+    """
+    Load and call each entry-point template function, in entry-point order
+    各entry-pointのテンプレート関数を順番に読み込み・呼び出す
+
+    Results that are plain JSON data are served from the registry cache when
+    ONEENV_CACHE_DIR is set and the installed distributions have not changed.
+    Failures are returned with their exception instead of being raised.
+    Coroutines returned by async template functions are awaited concurrently,
+    so their total time is bounded by the slowest one rather than the sum.
+
+    Args:
+        max_workers: Number of plugins loaded concurrently (default:
+            ONEENV_DISCOVERY_WORKERS, or 1 for serial loading)
+        timeout: Seconds a single plugin may take before it is skipped
+            (default: ONEENV_PLUGIN_TIMEOUT, or no timeout)
+
+    The returned order is the entry-point order regardless of max_workers, so
+    generated output is identical to serial loading.
+
+    Note: editing an editable-installed plugin without reinstalling it does not
+    change the fingerprint; remove the cache file to pick up such changes.
+    """
+    eps = list(eps)
+    cache_dir = get_cache_dir()
+    cache = RegistryCache(cache_dir, group) if cache_dir else None
+    fingerprint = None
+    cached: Dict[str, Any] = {}
+
+    if cache is not None:
+        try:
+            fingerprint = distributions_fingerprint()
+            cached = cache.load(fingerprint)
+        except Exception as e:
+            if debug:
+                print(f"Registry cache unavailable: {e}")
+            cache = None
+
+    if max_workers is None:
+        max_workers = _env_number(WORKERS_ENV, int) or 1
+    if timeout is None:
+        timeout = _env_number(TIMEOUT_ENV, float)
+
+    keys = [entry_point_key(ep) for ep in eps]
+    to_load = [ep for ep, key in zip(eps, keys) if key not in cached]
+    if max_workers > 1 or timeout is not None:
+        outcomes = _load_concurrently(to_load, max(max_workers, 1), timeout)
+    else:
+        outcomes = _load_serially(to_load)
+    outcomes = _resolve_awaitables(to_load, outcomes, timeout)
+    loaded = iter(outcomes)
+
+    results = []
+    entries = dict(cached)
+    for ep, key in zip(eps, keys):
+        if key in cached:
+            results.append(LoadedEntryPoint(ep.name, cached[key], None, cached=True))
+            if debug:
+                print(f"Using cached template plugin: {ep.name}")
+            continue
+
+        template_result, error = next(loaded)
+        if error is not None:
+            if isinstance(error, TimeoutError):
+                print(f"⚠️  Skipping template plugin {ep.name}: {error}", file=sys.stderr)
+            results.append(LoadedEntryPoint(ep.name, None, error))
+            continue
+
+        results.append(LoadedEntryPoint(ep.name, template_result, None))
+        if cache is not None and _is_json_serializable(template_result):
+            entries[key] = template_result
+
+    if cache is not None and entries != cached:
+        cache.save(fingerprint, entries)
+
+    return results
+
+
+class EntryPointDiscovery:
+    """
+    Single shared discovery pass over an entry-point group
+    entry-pointグループを1回だけ走査し、結果を共有するディスカバリエンジン
+
+    Each entry point is loaded and its template function called at most once
+    per process; the results are shared by OneEnvCore (legacy and groups
+    formats) and ScaffoldingTemplateProcessor (scaffolding format).
+    Loading is serialized by a lock; lookups of already loaded entry points
+    do not take it.
+    """
+
+    def __init__(self,
+                 group: str = "oneenv.templates",
+                 max_workers: Optional[int] = None,
+                 timeout: Optional[float] = None):
+        self.group = group
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._loaded: Dict[str, LoadedEntryPoint] = {}
+        self._advertised: Dict[str, Optional[Dict[str, List[str]]]] = {}
+        self._lock = threading.RLock()
+        # Incremented whenever the set of loaded results changes
+        self.generation = 0
+
+    def read_advertised_structure(self, ep: Any) -> Optional[Dict[str, List[str]]]:
+        """
+        Statically declared {category: [options]} of a plugin (memoized)
+        プラグインが静的に宣言したカテゴリ構造を返す（メモ化）
+        """
+        key = entry_point_key(ep)
+        if key not in self._advertised:
+            self._advertised[key] = read_advertised_structure(ep)
+        return self._advertised[key]
+
+    def load(self, eps: Iterable[Any], debug: bool = False) -> List[LoadedEntryPoint]:
+        """
+        Return the loaded result of each entry point, loading only new ones
+        各entry-pointの読み込み結果を返す（未読み込みのものだけを読み込む）
+        """
+        eps = list(eps)
+        keys = [entry_point_key(ep) for ep in eps]
+        results = [self._loaded.get(key) for key in keys]
+        if any(result is None for result in results):
+            with self._lock:
+                # Another thread may have loaded some of them while we waited
+                missing = [ep for ep, key in zip(eps, keys) if key not in self._loaded]
+                if missing:
+                    loaded_results = load_entry_point_results(
+                        missing, self.group, debug, self.max_workers, self.timeout
+                    )
+                    for ep, loaded in zip(missing, loaded_results):
+                        self._loaded[entry_point_key(ep)] = loaded
+                    self.generation += 1
+                results = [self._loaded[key] for key in keys]
+        elif debug and eps:
+            print(f"Reusing {len(eps)} discovered template plugins")
+        return results
+
+    def forget(self, keys: Iterable[str]) -> None:
+        """
+        Drop the results of the given entry-point keys (e.g. uninstalled plugins)
+        指定したentry-pointの結果を破棄する
+        """
+        with self._lock:
+            for key in keys:
+                self._loaded.pop(key, None)
+                self._advertised.pop(key, None)
+            self.generation += 1
+
+    def clear(self) -> None:
+        """
+        Forget all loaded results so the next load() imports plugins again
+        読み込み済み結果を破棄する
+        """
+        with self._lock:
+            self._loaded.clear()
+            self._advertised.clear()
+            self.generation += 1
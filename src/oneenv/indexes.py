@@ -0,0 +1,182 @@
+"""
+OneEnv Catalogue Indexes
+テンプレートカタログの索引
+
+Read-only lookup structures built once from the loaded templates, so that
+queries do not walk every EnvOption / EnvTemplate.
+読み込み済みテンプレートから一度だけ構築する読み取り専用の索引で、
+問い合わせのたびに全EnvOption/EnvTemplateを走査せずに済みます。
+"""
+
+import math
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Scripts written without spaces (kana, CJK ideographs, hangul) are indexed as
+# character bigrams, so that any word inside a run like "接続プールサイズ" matches
+_CJK_CHARS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff66-\uff9f"
+_CJK_RUN_RE = re.compile(f"[{_CJK_CHARS}]+")
+# Letters and digits of any script; underscores and punctuation separate tokens
+_TOKEN_RE = re.compile(f"[{_CJK_CHARS}]+|[^\\W_{_CJK_CHARS}]+")
+
+# Field weights for search ranking: a hit in the variable name counts most
+NAME_WEIGHT = 3.0
+CATEGORY_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+# A query token that only matches as a prefix of an indexed token scores this fraction
+PREFIX_FACTOR = 0.5
+
+
+class VariableLocation(NamedTuple):
+    """
+    Where an environment variable is defined
+    環境変数の定義元
+    """
+    variable: str
+    source: Optional[str]      # Plugin entry-point name or template function name
+    category: Optional[str]    # None for legacy (non-scaffolding) templates
+    option: Optional[str]
+    importance: str
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        return self._asdict()
+
+
+class VariableIndex:
+    """
+    Variable name -> definitions, with exact and prefix lookups
+    変数名から定義元への索引（完全一致・前方一致検索）
+
+    Names are kept sorted so a prefix query is a binary search followed by a
+    scan of the matching names only.
+    """
+
+    def __init__(self, locations: Iterable[VariableLocation] = ()):
+        self._by_name: Dict[str, List[VariableLocation]] = {}
+        for location in locations:
+            self._by_name.setdefault(location.variable, []).append(location)
+        self._names = sorted(self._by_name)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def lookup(self, name: str) -> List[VariableLocation]:
+        """Definitions of exactly `name`"""
+        return list(self._by_name.get(name, ()))
+
+    def lookup_prefix(self, prefix: str) -> List[VariableLocation]:
+        """Definitions of every variable starting with `prefix`, ordered by name"""
+        names = self._names
+        result = []
+        i = bisect_left(names, prefix)
+        while i < len(names) and names[i].startswith(prefix):
+            result.extend(self._by_name[names[i]])
+            i += 1
+        return result
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Lower-case word tokens ("DATABASE_POOL_SIZE" -> ["database", "pool", "size"])
+    
+    CJK runs become character bigrams ("Redis接続" -> ["redis", "接続"]).
+    """
+    if not text:
+        return []
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if len(token) > 1 and _CJK_RUN_RE.match(token):
+            tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+class SearchResult(NamedTuple):
+    """
+    One ranked search hit
+    ランク付けされた検索結果
+    """
+    score: float
+    location: VariableLocation
+    description: str
+
+    def to_dict(self) -> Dict[str, object]:
+        result = self.location.to_dict()
+        result["description"] = self.description
+        result["score"] = round(self.score, 4)
+        return result
+
+
+class SearchIndex:
+    """
+    Token inverted index over variable names, descriptions, categories and options
+    変数名・説明・カテゴリ・オプションのトークン転置索引
+
+    Every query token must match (exactly, or as a prefix of an indexed token);
+    hits are ranked by field weight times inverse document frequency.
+    """
+
+    def __init__(self, documents: Iterable[Tuple[VariableLocation, str]] = ()):
+        self._documents: List[Tuple[VariableLocation, str]] = []
+        self._postings: Dict[str, Dict[int, float]] = {}
+        for location, description in documents:
+            doc_id = len(self._documents)
+            self._documents.append((location, description))
+            for weight, text in ((NAME_WEIGHT, location.variable),
+                                 (CATEGORY_WEIGHT, location.category),
+                                 (CATEGORY_WEIGHT, location.option),
+                                 (DESCRIPTION_WEIGHT, description)):
+                for token in tokenize(text):
+                    postings = self._postings.setdefault(token, {})
+                    postings[doc_id] = postings.get(doc_id, 0.0) + weight
+        self._vocabulary = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _token_scores(self, token: str) -> Dict[int, float]:
+        """doc_id -> score for one query token, including prefix expansions"""
+        scores: Dict[int, float] = {}
+        total = len(self._documents)
+        vocabulary = self._vocabulary
+        i = bisect_left(vocabulary, token)
+        while i < len(vocabulary) and vocabulary[i].startswith(token):
+            term = vocabulary[i]
+            postings = self._postings[term]
+            idf = math.log(1 + total / len(postings))
+            factor = 1.0 if term == token else PREFIX_FACTOR
+            for doc_id, weight in postings.items():
+                score = weight * idf * factor
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+            i += 1
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = 20) -> List[SearchResult]:
+        """Documents matching every token of `query`, best first"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        # Intersect starting from the rarest token
+        per_token = sorted((self._token_scores(token) for token in tokens), key=len)
+        totals = dict(per_token[0])
+        for scores in per_token[1:]:
+            totals = {doc_id: total + scores[doc_id]
+                      for doc_id, total in totals.items() if doc_id in scores}
+            if not totals:
+                return []
+
+        def sort_key(item):
+            location = self._documents[item[0]][0]
+            return (-item[1], location.variable, location.category or "", location.option or "")
+
+        ranked = sorted(totals.items(), key=sort_key)
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [SearchResult(score, *self._documents[doc_id]) for doc_id, score in ranked]
@@ -18,9 +18,8 @@ def get_structure_info(json_format: bool = False) -> Union[str, Dict]:
     Returns:
         構造情報（文字列またはDict）
     """
-    # テンプレートが既に読み込まれていない場合のみ読み込み
-    if not _scaffolding_processor.env_options:
-        _scaffolding_processor.load_all_scaffolding_templates()
+    # 全テンプレートの変数が読み込まれていない場合のみ読み込み
+    _scaffolding_processor.ensure_loaded()
     structure = _scaffolding_processor.get_template_structure()
     
     if not structure:
@@ -36,16 +35,17 @@ def get_structure_info(json_format: bool = False) -> Union[str, Dict]:
         else:
             return "No scaffolding templates are currently available."
     
-    # 変数数カウント
-    variable_counts = {}
-    total_variables = 0
-    
-    for category, options in structure.items():
-        variable_counts[category] = {}
-        for option in options:
-            count = _count_variables_for_option(category, option)
-            variable_counts[category][option] = count
-            total_variables += count
+    # 変数数（読み込み時に集計済み）
+    variable_counts = {
+        category: {
+            option: _scaffolding_processor.get_option_stats(category, option).variables
+            for option in options
+        }
+        for category, options in structure.items()
+    }
+    total_variables = sum(
+        _scaffolding_processor.get_category_stats(category).variables for category in structure
+    )
     
     if json_format:
         return {
@@ -96,9 +96,8 @@ def get_category_info(category: str, json_format: bool = False) -> Union[str, Di
     Raises:
         ValueError: カテゴリが存在しない場合
     """
-    # テンプレートが既に読み込まれていない場合のみ読み込み
-    if not _scaffolding_processor.env_options:
-        _scaffolding_processor.load_all_scaffolding_templates()
+    # 索引が未作成の場合のみ作成
+    _scaffolding_processor.ensure_index()
     
     if not _scaffolding_processor.has_category(category):
         available_categories = list(_scaffolding_processor.get_template_structure().keys())
@@ -107,20 +106,14 @@ def get_category_info(category: str, json_format: bool = False) -> Union[str, Di
         else:
             raise ValueError(f"Category '{category}' not found. No scaffolding templates are currently available.")
     
+    # このカテゴリを提供するプラグインのみ読み込み
+    _scaffolding_processor.load_categories([category])
     options = _scaffolding_processor.get_options(category)
     
-    # 各オプションの詳細情報を収集
-    option_details = {}
-    importance_counts = {"critical": 0, "important": 0, "optional": 0}
-    
-    for option in options:
-        variables = _get_option_variables(category, option)
-        option_details[option] = variables
-        
-        # 重要度カウント
-        for var_config in variables.values():
-            importance = getattr(var_config, 'importance', 'important')
-            importance_counts[importance] += 1
+    # 各オプションの詳細情報を収集（集計値は読み込み時に計算済み）
+    option_details = {option: _get_option_variables(category, option) for option in options}
+    category_stats = _scaffolding_processor.get_category_stats(category)
+    importance_counts = category_stats.importance_counts()
     
     if json_format:
         return {
@@ -142,7 +135,8 @@ def get_category_info(category: str, json_format: bool = False) -> Union[str, Di
             },
             "summary": {
                 "total_options": len(options),
-                "total_variables": sum(len(vars) for vars in option_details.values()),
+                "total_variables": category_stats.variables,
+                "required_variables": category_stats.required,
                 "importance_counts": importance_counts
             }
         }
@@ -184,9 +178,8 @@ def get_option_preview(category: str, option: str) -> str:
     Raises:
         ValueError: カテゴリまたはオプションが存在しない場合
     """
-    # テンプレートが既に読み込まれていない場合のみ読み込み
-    if not _scaffolding_processor.env_options:
-        _scaffolding_processor.load_all_scaffolding_templates()
+    # 索引が未作成の場合のみ作成（必要なプラグインは生成時に読み込み）
+    _scaffolding_processor.ensure_index()
     
     # カテゴリ存在チェック
     if not _scaffolding_processor.has_category(category):
@@ -214,19 +207,14 @@ def get_option_preview(category: str, option: str) -> str:
 
 
 def _count_variables_for_option(category: str, option: str) -> int:
-    """特定オプションの変数数をカウント"""
-    for env_option in _scaffolding_processor.env_options:
-        if env_option.category == category and env_option.option == option:
-            return len(env_option.env)
-    return 0
+    """特定オプションの変数数を取得"""
+    return _scaffolding_processor.get_option_stats(category, option).variables
 
 
 def _get_option_variables(category: str, option: str) -> Dict[str, Any]:
     """特定オプションの変数一覧を取得"""
-    for env_option in _scaffolding_processor.env_options:
-        if env_option.category == category and env_option.option == option:
-            return env_option.env
-    return {}
+    env_options = _scaffolding_processor.find_options(category, option)
+    return env_options[0].env if env_options else {}
 
 
 def get_detailed_structure() -> Dict[str, Any]:
@@ -236,42 +224,32 @@ def get_detailed_structure() -> Dict[str, Any]:
     Returns:
         詳細構造情報
     """
-    # テンプレートが既に読み込まれていない場合のみ読み込み
-    if not _scaffolding_processor.env_options:
-        _scaffolding_processor.load_all_scaffolding_templates()
+    # 全テンプレートの変数が読み込まれていない場合のみ読み込み
+    _scaffolding_processor.ensure_loaded()
     structure = _scaffolding_processor.get_template_structure()
     
     categories_detail = {}
     total_variables = 0
     
     for category, options in structure.items():
-        option_details = {}
-        category_var_count = 0
-        importance_dist = {"critical": 0, "important": 0, "optional": 0}
-        
-        for option in options:
-            variables = _get_option_variables(category, option)
-            var_count = len(variables)
-            category_var_count += var_count
-            
-            # 重要度分布カウント
-            for var_config in variables.values():
-                importance = getattr(var_config, 'importance', 'important')
-                importance_dist[importance] += 1
-            
-            option_details[option] = {
-                "variable_count": var_count,
-                "variables": list(variables.keys())
+        option_details = {
+            option: {
+                "variable_count": _scaffolding_processor.get_option_stats(category, option).variables,
+                "variables": list(_get_option_variables(category, option).keys())
             }
+            for option in options
+        }
+        category_stats = _scaffolding_processor.get_category_stats(category)
         
         categories_detail[category] = {
             "options": options,
             "option_details": option_details,
-            "total_variables": category_var_count,
-            "importance_distribution": importance_dist
+            "total_variables": category_stats.variables,
+            "required_variables": category_stats.required,
+            "importance_distribution": category_stats.importance_counts()
         }
         
-        total_variables += category_var_count
+        total_variables += category_stats.variables
     
     return {
         "categories": categories_detail,
@@ -0,0 +1,109 @@
+"""
+OneEnv Template Module Manifest
+pyproject.tomlによるテンプレートモジュールの明示的な指定
+
+Projects can list their template modules in pyproject.toml so that
+import_templates() imports exactly those instead of searching sys.path:
+プロジェクトはpyproject.tomlにテンプレートモジュールを列挙でき、
+import_templates()はsys.pathを探索せずにそれらだけをインポートします:
+
+    [tool.oneenv]
+    templates = ["myapp.settings", "myapp.plugins.*"]
+
+Entries are module or package names. Entries containing glob characters are
+matched (fnmatch) against the modules found under the longest non-glob
+package prefix, without importing anything.
+エントリはモジュール名またはパッケージ名です。グロブ文字を含むエントリは、
+グロブを含まない最長のパッケージ接頭辞以下のモジュールに対して、
+インポートせずにfnmatchで照合されます。
+"""
+
+import fnmatch
+import importlib.util
+import os
+from typing import List, Optional
+
+from .scanner import iter_source_files
+
+PYPROJECT_FILENAME = "pyproject.toml"
+GLOB_CHARS = "*?["
+
+
+def _load_toml(path: str) -> dict:
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        import tomli as tomllib
+    with open(path, 'rb') as f:
+        return tomllib.load(f)
+
+
+def load_template_manifest(path: Optional[str] = None) -> Optional[List[str]]:
+    """
+    Return the `[tool.oneenv] templates` entries, or None when not configured
+    `[tool.oneenv] templates` のエントリを返す（未設定の場合はNone）
+
+    Args:
+        path: pyproject.toml to read (default: the one in the current directory)
+    """
+    if path is None:
+        path = os.path.join(os.getcwd(), PYPROJECT_FILENAME)
+    if not os.path.isfile(path):
+        return None
+
+    config = _load_toml(path).get("tool", {}).get("oneenv", {})
+    if "templates" not in config:
+        return None
+    templates = config["templates"]
+    if not isinstance(templates, list) or not all(isinstance(t, str) for t in templates):
+        raise ValueError(f"[tool.oneenv] templates in {path} must be a list of module names")
+    return templates
+
+
+def _package_dirs(package: str, roots: List[str]) -> List[str]:
+    """Directories holding the submodules of `package`"""
+    if not package:
+        return list(roots)
+    try:
+        spec = importlib.util.find_spec(package)
+    except (ImportError, ValueError):
+        return []
+    if spec is None or not spec.submodule_search_locations:
+        return []
+    return list(spec.submodule_search_locations)
+
+
+def expand_template_manifest(entries: List[str], roots: List[str]) -> List[str]:
+    """
+    Resolve manifest entries to module names, expanding glob patterns
+    マニフェストのエントリをモジュール名に解決（グロブパターンを展開）
+
+    Args:
+        entries: Module names or glob patterns from the manifest
+        roots: Directories searched for top-level patterns (e.g. "settings_*")
+    """
+    modules = []
+    seen = set()
+    for entry in entries:
+        if not any(c in entry for c in GLOB_CHARS):
+            matches = [entry]
+        else:
+            parts = entry.split(".")
+            fixed = []
+            for part in parts:
+                if any(c in part for c in GLOB_CHARS):
+                    break
+                fixed.append(part)
+            package = ".".join(fixed)
+            prefix = f"{package}." if package else ""
+            matches = [
+                module_name
+                for directory in _package_dirs(package, roots)
+                for module_name, _ in iter_source_files(directory, prefix)
+                if fnmatch.fnmatchcase(module_name, entry)
+            ]
+        for module_name in matches:
+            if module_name not in seen:
+                seen.add(module_name)
+                modules.append(module_name)
+    return modules
@@ -5,8 +5,9 @@ This module defines Pydantic models for type-safe environment variable templates
 環境変数テンプレート用のPydanticモデルを定義するモジュールです。
 """
 
-from typing import Dict, List, Optional, Any, Union
-from pydantic import BaseModel, Field, field_validator, model_validator
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Any, Tuple, Union
+from pydantic import BaseModel, Field, PrivateAttr, TypeAdapter, ValidationError, field_validator, model_validator
 import sys
 
 if sys.version_info < (3, 10):
@@ -70,6 +71,60 @@ class EnvVarConfig(BaseModel):
         return self
 
 
+class EnvVarRecord(NamedTuple):
+    """
+    Compact immutable form of an already validated EnvVarConfig
+    検証済みEnvVarConfigの軽量な不変表現
+
+    Used on the merge/grouping/render path so that merging many templates does
+    not construct and re-validate pydantic models. It exposes the same
+    attribute names as EnvVarConfig; to_config() builds the public model.
+    """
+    description: str
+    default: str = ""
+    required: bool = False
+    choices: Optional[Tuple[str, ...]] = None
+    group: Optional[str] = None
+    importance: str = "important"
+
+    @classmethod
+    def from_config(cls, config: EnvVarConfig) -> "EnvVarRecord":
+        return cls(
+            config.description,
+            config.default,
+            config.required,
+            tuple(config.choices) if config.choices is not None else None,
+            config.group,
+            config.importance,
+        )
+
+    def to_config(self) -> EnvVarConfig:
+        """Build the public EnvVarConfig without re-running validation"""
+        return EnvVarConfig.model_construct(
+            description=self.description,
+            default=self.default,
+            required=self.required,
+            choices=list(self.choices) if self.choices is not None else None,
+            group=self.group,
+            importance=self.importance,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Legacy dictionary form (same as env_var_config_to_dict)"""
+        result = {
+            "description": self.description,
+            "default": self.default,
+            "required": self.required,
+        }
+        if self.choices is not None:
+            result["choices"] = list(self.choices)
+        if self.group is not None:
+            result["group"] = self.group
+        if self.importance != "important":
+            result["importance"] = self.importance
+        return result
+
+
 class EnvTemplate(BaseModel):
     """
     Template containing multiple environment variables
@@ -111,9 +166,127 @@ class TemplateCollection(BaseModel):
         description="List of environment variable templates"
     )
     
+    # Merge index, maintained as templates are added:
+    #   _records:    var_name -> {"config": EnvVarRecord, "sources": [...]}
+    #   _originals:  var_name -> EnvVarConfig for variables defined by one template
+    #   _models:     var_name -> EnvVarConfig built for merged variables (dropped when they change)
+    #   _duplicates: ordered set of variables defined by several sources
+    #   _grouped:    importance -> group -> var_name -> the same dicts as _records
+    #   _descriptions: var_name -> {description: source} for merged variables, in
+    #                source order and deduplicated by hash; joined only when a view
+    #                is requested (_stale lists the variables whose text is out of date)
+    _records: Dict[str, Dict[str, Any]] = PrivateAttr(default_factory=dict)
+    _originals: Dict[str, EnvVarConfig] = PrivateAttr(default_factory=dict)
+    _models: Dict[str, EnvVarConfig] = PrivateAttr(default_factory=dict)
+    _duplicates: Dict[str, None] = PrivateAttr(default_factory=dict)
+    _grouped: Dict[str, Dict[str, Dict[str, Any]]] = PrivateAttr(default_factory=dict)
+    _descriptions: Dict[str, Dict[str, str]] = PrivateAttr(default_factory=dict)
+    _stale: Dict[str, None] = PrivateAttr(default_factory=dict)
+    _indexed_templates: Optional[List[EnvTemplate]] = PrivateAttr(default=None)
+    _indexed_count: int = PrivateAttr(default=0)
+    
     def add_template(self, template: EnvTemplate) -> None:
         """Add a template to the collection"""
         self.templates.append(template)
+        self._sync_index()
+    
+    def _sync_index(self) -> None:
+        """
+        Bring the merge index up to date with self.templates
+        マージ索引をself.templatesと同期
+        
+        Templates appended to the list are indexed incrementally; if the list
+        was replaced or shrunk, the index is rebuilt.
+        """
+        if self._indexed_templates is not self.templates or len(self.templates) < self._indexed_count:
+            self._records = {}
+            self._originals = {}
+            self._models = {}
+            self._duplicates = {}
+            self._grouped = {"critical": {}, "important": {}, "optional": {}}
+            self._descriptions = {}
+            self._stale = {}
+            self._indexed_templates = self.templates
+            self._indexed_count = 0
+        
+        for template in self.templates[self._indexed_count:]:
+            self._index_template(template)
+        self._indexed_count = len(self.templates)
+    
+    def _sync_views(self) -> None:
+        """Index new templates and join the descriptions of variables merged since the last view"""
+        self._sync_index()
+        for var_name in self._stale:
+            info = self._records[var_name]
+            info["config"] = info["config"]._replace(
+                description=self._join_descriptions(self._descriptions[var_name])
+            )
+        self._stale.clear()
+    
+    @staticmethod
+    def _join_descriptions(descriptions: Dict[str, str]) -> str:
+        """First source's description followed by "# From <source>:" sections"""
+        items = iter(descriptions.items())
+        first, _ = next(items)
+        return first + "".join(f"\n\n# From {source}:\n{desc}" for desc, source in items)
+    
+    def _index_template(self, template: EnvTemplate) -> None:
+        source = template.source
+        for var_name, var_config in template.variables.items():
+            info = self._records.get(var_name)
+            if info is None:
+                # New variable
+                record = EnvVarRecord.from_config(var_config)
+                info = {"config": record, "sources": [source]}
+                self._records[var_name] = info
+                self._originals[var_name] = var_config
+                # Importance and group come from the first source, so the slot never moves
+                group = record.group or "General"  # Default group for ungrouped variables
+                self._grouped[record.importance].setdefault(group, {})[var_name] = info
+                continue
+            
+            # Variable already exists - collect its description and track sources.
+            # Every other setting is kept from the first source.
+            descriptions = self._descriptions.get(var_name)
+            if descriptions is None:
+                descriptions = {info["config"].description.strip(): info["sources"][0]}
+                self._descriptions[var_name] = descriptions
+            new_desc = var_config.description.strip()
+            if new_desc and new_desc not in descriptions:
+                descriptions[new_desc] = source
+            self._stale[var_name] = None
+            self._originals.pop(var_name, None)
+            self._models.pop(var_name, None)
+            
+            # Add source if not already present
+            if source not in info["sources"]:
+                info["sources"].append(source)
+                if len(info["sources"]) > 1:
+                    self._duplicates[var_name] = None
+    
+    def _config_model(self, var_name: str) -> EnvVarConfig:
+        """Public model for one variable, built at most once per change"""
+        config = self._originals.get(var_name)
+        if config is None:
+            config = self._models.get(var_name)
+            if config is None:
+                config = self._records[var_name]["config"].to_config()
+                self._models[var_name] = config
+        return config
+    
+    def get_merged_records(self) -> Mapping[str, Dict[str, Any]]:
+        """
+        Merged variables as lightweight records (read-only view of the index)
+        マージ済み変数の軽量レコード（索引の読み取り専用ビュー）
+        
+        Same merge rules as get_merged_variables(), but "config" is an
+        EnvVarRecord and no pydantic model is constructed.
+        
+        Returns:
+            Mapping[var_name, {"config": EnvVarRecord, "sources": List[str]}]
+        """
+        self._sync_views()
+        return MappingProxyType(self._records)
     
     def get_merged_variables(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -123,47 +296,11 @@ class TemplateCollection(BaseModel):
         Returns:
             Dict[var_name, {"config": EnvVarConfig, "sources": List[str]}]
         """
-        merged = {}
-        
-        for template in self.templates:
-            for var_name, var_config in template.variables.items():
-                if var_name in merged:
-                    # Variable already exists - merge descriptions and track sources
-                    existing_config = merged[var_name]["config"]
-                    
-                    # Collect descriptions from all sources
-                    existing_desc = existing_config.description.strip()
-                    new_desc = var_config.description.strip()
-                    
-                    # Merge descriptions if they're different
-                    if new_desc and new_desc not in existing_desc:
-                        merged_description = f"{existing_desc}\n\n# From {template.source}:\n{new_desc}"
-                    else:
-                        merged_description = existing_desc
-                    
-                    # Create new config with merged description but keep other settings from first source
-                    merged_config = EnvVarConfig(
-                        description=merged_description,
-                        default=existing_config.default,  # Keep first source's default
-                        required=existing_config.required,  # Keep first source's required
-                        choices=existing_config.choices,    # Keep first source's choices
-                        group=existing_config.group,        # Keep first source's group
-                        importance=existing_config.importance  # Keep first source's importance
-                    )
-                    
-                    merged[var_name]["config"] = merged_config
-                    
-                    # Add source if not already present
-                    if template.source not in merged[var_name]["sources"]:
-                        merged[var_name]["sources"].append(template.source)
-                else:
-                    # New variable
-                    merged[var_name] = {
-                        "config": var_config,
-                        "sources": [template.source]
-                    }
-        
-        return merged
+        self._sync_views()
+        return {
+            var_name: {"config": self._config_model(var_name), "sources": list(info["sources"])}
+            for var_name, info in self._records.items()
+        }
     
     def get_duplicate_variables(self) -> Dict[str, List[str]]:
         """
@@ -173,11 +310,10 @@ class TemplateCollection(BaseModel):
         Returns:
             Dict[var_name, List[source_names]]
         """
-        merged = self.get_merged_variables()
+        self._sync_views()
         return {
-            var_name: info["sources"]
-            for var_name, info in merged.items()
-            if len(info["sources"]) > 1
+            var_name: list(self._records[var_name]["sources"])
+            for var_name in self._duplicates
         }
     
     def get_grouped_variables(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
@@ -188,20 +324,25 @@ class TemplateCollection(BaseModel):
         Returns:
             Dict[importance, Dict[group_name, Dict[var_name, var_info]]]
         """
-        merged = self.get_merged_variables()
-        grouped = {"critical": {}, "important": {}, "optional": {}}
-        
-        for var_name, var_info in merged.items():
-            config = var_info["config"]
-            importance = config.importance
-            group = config.group or "General"  # Default group for ungrouped variables
-            
-            if group not in grouped[importance]:
-                grouped[importance][group] = {}
-            
-            grouped[importance][group][var_name] = var_info
-        
-        return grouped
+        self._sync_views()
+        return {
+            importance: {
+                group: {
+                    var_name: {"config": self._config_model(var_name), "sources": list(info["sources"])}
+                    for var_name, info in variables.items()
+                }
+                for group, variables in groups.items()
+            }
+            for importance, groups in self._grouped.items()
+        }
+    
+    def get_grouped_records(self) -> Mapping[str, Dict[str, Dict[str, Any]]]:
+        """
+        get_grouped_variables() with EnvVarRecord configs (read-only view, used for rendering)
+        get_grouped_variables()のEnvVarRecord版（読み取り専用ビュー、レンダリング用）
+        """
+        self._sync_views()
+        return MappingProxyType(self._grouped)
     
     def validate_all_templates(self) -> List[str]:
         """
@@ -454,20 +595,76 @@ def validate_scaffolding_format(template_data: Any) -> bool:
     return True
 
 
-def scaffolding_template_function_to_env_options(func_name: str, template_list: List[Dict[str, Any]]) -> List[EnvOption]:
+# Compiled validator for a whole scaffolding template (built on first use)
+_env_options_adapter: Optional[TypeAdapter] = None
+
+
+def _option_label(template_data: List[Any], index: Any) -> str:
+    """"Option 0 (Database/postgres)" for error messages"""
+    label = f"Option {index}"
+    item = template_data[index] if isinstance(index, int) and index < len(template_data) else None
+    if isinstance(item, dict) and isinstance(item.get("category"), str) and isinstance(item.get("option"), str):
+        label += f" ({item['category']}/{item['option']})"
+    return label
+
+
+def build_env_options(func_name: str, template_data: Any) -> List[EnvOption]:
     """
-    新スキャフォールディング形式のテンプレート関数結果をEnvOptionリストに変換
+    Scaffolding形式のテンプレートデータを1回の走査で検証しEnvOptionリストに変換
+    
+    validate_scaffolding_format()とscaffolding_template_function_to_env_options()を
+    組み合わせた処理を、コンパイル済みのpydantic TypeAdapterで一度に行います。
+    
+    Raises:
+        ValueError: 不正な形式の場合（すべてのエラーをオプション/変数のパス付きで報告）
     """
-    env_options = []
+    global _env_options_adapter
+    
+    if not isinstance(template_data, list):
+        raise ValueError(f"Invalid template function {func_name}: Template must be a list of options")
+    if not template_data:
+        raise ValueError(f"Invalid template function {func_name}: Template cannot be empty")
     
-    for option_dict in template_list:
-        try:
-            env_option = dict_to_env_option(option_dict)
-            env_options.append(env_option)
-        except Exception as e:
-            raise ValueError(f"Invalid option in template function {func_name}: {str(e)}")
+    if _env_options_adapter is None:
+        _env_options_adapter = TypeAdapter(List[EnvOption])
     
-    return env_options
+    errors = []
+    try:
+        options = _env_options_adapter.validate_python(template_data)
+    except ValidationError as e:
+        options = []
+        for error in e.errors():
+            index, *path = error["loc"] or ("?",)
+            location = ".".join(str(part) for part in path)
+            prefix = _option_label(template_data, index)
+            errors.append(f"{prefix} {location}: {error['msg']}" if location else f"{prefix}: {error['msg']}")
+    
+    # Checks the models cannot express: unique category/option pairs and variable names
+    pairs = set()
+    for i, item in enumerate(template_data):
+        if not isinstance(item, dict):
+            continue
+        category, option = item.get("category"), item.get("option")
+        if isinstance(category, str) and isinstance(option, str) and category.strip() and option.strip():
+            pair = (category.strip(), option.strip())
+            if pair in pairs:
+                errors.append(f"Option {i}: Duplicate category/option pair: {category}/{option}")
+            pairs.add(pair)
+        env_data = item.get("env")
+        if isinstance(env_data, dict) and any(not str(name).strip() for name in env_data):
+            errors.append(f"{_option_label(template_data, i)} env: Environment variable name must be non-empty string")
+    
+    if errors:
+        raise ValueError(f"Invalid template function {func_name}:\n  - " + "\n  - ".join(errors))
+    return options
+
+
+def scaffolding_template_function_to_env_options(func_name: str, template_list: List[Dict[str, Any]]) -> List[EnvOption]:
+    """
+    新スキャフォールディング形式のテンプレート関数結果をEnvOptionリストに変換
+    （検証と変換はbuild_env_options()で一度に行う）
+    """
+    return build_env_options(func_name, template_list)
 
 
 # Example usage and validation
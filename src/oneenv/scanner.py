@@ -0,0 +1,276 @@
+"""
+OneEnv Template Module Scanner
+@oneenvテンプレートを含むモジュールの静的探索
+
+Finds the modules that register templates (functions decorated with @oneenv
+or classes subclassing OneEnv) by parsing their source with `ast`, so that
+import_templates() only imports those modules instead of every module on
+the search path.
+ソースをastで解析してテンプレートを登録するモジュールを特定し、
+import_templates()がそれらのモジュールだけをインポートできるようにします。
+
+When ONEENV_CACHE_DIR is set, scan results are kept in an on-disk index keyed
+by path, size and mtime, so repeat runs only re-parse files that changed.
+ONEENV_CACHE_DIRが設定されている場合、スキャン結果をパス・サイズ・mtimeを
+キーとしてディスクに保存し、変更されたファイルのみ再解析します。
+
+Large trees can be parsed by a pool of worker processes; workers only return
+the paths that register templates and the main process does the importing.
+大規模なツリーはワーカープロセスのプールで解析できます。ワーカーは
+テンプレートを登録するパスのみを返し、インポートはメインプロセスで行います。
+"""
+
+import ast
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .cache import get_cache_dir, read_json_cache, write_json_cache
+
+# Bump when the detection rules or the layout of the index file change
+SCAN_CACHE_VERSION = 1
+
+# Below this many files to parse, starting worker processes costs more than it saves
+PARALLEL_MIN_FILES = 200
+
+DECORATOR_NAMES = frozenset({"oneenv"})
+BASE_CLASS_NAMES = frozenset({"OneEnv"})
+
+
+def _tail_name(node: ast.AST) -> str:
+    """Last component of a decorator/base expression (`a.b.oneenv()` -> "oneenv")"""
+    if isinstance(node, ast.Call):
+        return _tail_name(node.func)
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return ""
+
+
+def _imported_aliases(tree: ast.AST) -> Tuple[Set[str], Set[str]]:
+    """Names bound to the oneenv decorator / OneEnv base via `from oneenv import ... as ...`"""
+    decorators = set(DECORATOR_NAMES)
+    bases = set(BASE_CLASS_NAMES)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module and node.module.split(".")[0] == "oneenv":
+            for alias in node.names:
+                if alias.name in DECORATOR_NAMES:
+                    decorators.add(alias.asname or alias.name)
+                elif alias.name in BASE_CLASS_NAMES:
+                    bases.add(alias.asname or alias.name)
+    return decorators, bases
+
+
+def source_registers_templates(source: bytes) -> bool:
+    """
+    Whether module source registers OneEnv templates
+    モジュールのソースがOneEnvテンプレートを登録するかどうかを判定
+
+    Sources that never mention "oneenv" are rejected without parsing.
+    """
+    if b"oneenv" not in source.lower():
+        return False
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return False
+
+    decorators, bases = _imported_aliases(tree)
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if any(_tail_name(d) in decorators for d in node.decorator_list):
+                return True
+        elif isinstance(node, ast.ClassDef):
+            if any(_tail_name(b) in bases for b in node.bases):
+                return True
+    return False
+
+
+def scan_file(path: str) -> bool:
+    """
+    Whether the source file at `path` registers OneEnv templates
+    ソースファイルがOneEnvテンプレートを登録するかどうかを判定
+    """
+    try:
+        with open(path, 'rb') as f:
+            return source_registers_templates(f.read())
+    except OSError:
+        return False
+
+
+def iter_source_files(root: str, prefix: str = "") -> Iterator[Tuple[str, str]]:
+    """
+    Yield (module_name, path) for the modules importable from `root`
+    rootからインポート可能なモジュールの(モジュール名, パス)を列挙
+
+    Mirrors pkgutil.iter_modules() for the top level and also walks into
+    regular packages (directories with __init__.py).
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return
+
+    for entry in entries:
+        if entry.name.endswith(".py"):
+            name = entry.name[:-3]
+            if name.isidentifier() and name != "__init__" and entry.is_file():
+                yield prefix + name, entry.path
+        elif entry.name.isidentifier() and entry.is_dir():
+            init_path = os.path.join(entry.path, "__init__.py")
+            if os.path.isfile(init_path):
+                yield prefix + entry.name, init_path
+                yield from iter_source_files(entry.path, f"{prefix}{entry.name}.")
+
+
+class ScanCache:
+    """
+    On-disk index of which source files under a root register templates
+    ルート以下のソースファイルがテンプレートを登録するかどうかのディスク上の索引
+
+    Entries are keyed by path and validated against the file's size and
+    mtime, so a warm scan costs one stat() per file.
+    """
+
+    def __init__(self, cache_dir: str, root: str):
+        self.cache_dir = cache_dir
+        self.root = root
+        self._files: Dict[str, List] = {}
+        self._seen: Set[str] = set()
+        self._dirty = False
+
+    @property
+    def path(self) -> str:
+        digest = hashlib.sha256(self.root.encode("utf-8", "surrogateescape")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"scan-{digest}.json")
+
+    def load(self) -> None:
+        data = read_json_cache(self.path)
+        if (isinstance(data, dict) and data.get("version") == SCAN_CACHE_VERSION
+                and data.get("root") == self.root and isinstance(data.get("files"), dict)):
+            self._files = data["files"]
+
+    def lookup(self, path: str, stat: os.stat_result) -> Optional[bool]:
+        """Cached scan result for an unchanged file, or None"""
+        self._seen.add(path)
+        entry = self._files.get(path)
+        if (isinstance(entry, list) and len(entry) == 3
+                and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns):
+            return bool(entry[2])
+        return None
+
+    def store(self, path: str, stat: os.stat_result, registers: bool) -> None:
+        self._seen.add(path)
+        self._files[path] = [stat.st_size, stat.st_mtime_ns, registers]
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the index, dropping files that no longer exist"""
+        stale = set(self._files) - self._seen
+        if not self._dirty and not stale:
+            return
+        for path in stale:
+            del self._files[path]
+        write_json_cache(self.path, {
+            "version": SCAN_CACHE_VERSION,
+            "root": self.root,
+            "files": self._files,
+        })
+        self._dirty = False
+
+
+def _scan_batch(paths: List[str]) -> List[str]:
+    """Worker entry point: the paths in `paths` that register templates"""
+    return [path for path in paths if scan_file(path)]
+
+
+def _resolve_processes(processes: Optional[int]) -> int:
+    if processes is None:
+        return 1
+    if processes < 0:
+        raise ValueError("processes must be 0 (one per CPU) or a positive number")
+    return processes or os.cpu_count() or 1
+
+
+def _scan_paths(paths: List[str], processes: int) -> Set[str]:
+    """Parse `paths`, in worker processes when there are enough of them"""
+    if processes <= 1 or len(paths) < max(PARALLEL_MIN_FILES, 2):
+        return {path for path in paths if scan_file(path)}
+
+    # A few batches per worker keeps them busy without per-file IPC
+    size = max(1, -(-len(paths) // (processes * 4)))
+    batches = [paths[i:i + size] for i in range(0, len(paths), size)]
+    found: Set[str] = set()
+    with ProcessPoolExecutor(max_workers=min(processes, len(batches))) as pool:
+        for result in pool.map(_scan_batch, batches):
+            found.update(result)
+    return found
+
+
+def _scan_root(root: str, seen: Set[str], cache: Optional[ScanCache], processes: int) -> List[str]:
+    candidates = []
+    for module_name, path in iter_source_files(root):
+        if module_name in seen:
+            continue
+        seen.add(module_name)
+        candidates.append((module_name, path))
+
+    results: Dict[str, bool] = {}
+    pending = []
+    stats = {}
+    for _, path in candidates:
+        if cache is None:
+            pending.append(path)
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        registers = cache.lookup(path, stat)
+        if registers is None:
+            stats[path] = stat
+            pending.append(path)
+        else:
+            results[path] = registers
+
+    found = _scan_paths(pending, processes)
+    for path in pending:
+        results[path] = path in found
+        if cache is not None:
+            cache.store(path, stats[path], results[path])
+
+    return [module_name for module_name, path in candidates if results.get(path)]
+
+
+def find_template_modules(roots: List[str], use_cache: Optional[bool] = None,
+                          processes: Optional[int] = None) -> List[str]:
+    """
+    Return the names of the modules under `roots` that register templates
+    roots以下でテンプレートを登録するモジュール名のリストを返す
+
+    Args:
+        roots: Directories to scan (as in sys.path)
+        use_cache: Use the on-disk scan index (default: when ONEENV_CACHE_DIR is set)
+        processes: Worker processes for parsing (None: in-process, 0: one per CPU)
+    """
+    workers = _resolve_processes(processes)
+    cache_dir = get_cache_dir()
+    if use_cache is None:
+        use_cache = cache_dir is not None
+    if use_cache and cache_dir is None:
+        raise ValueError("use_cache requires the ONEENV_CACHE_DIR environment variable")
+
+    modules = []
+    seen: Set[str] = set()
+    for root in roots:
+        cache = None
+        if use_cache:
+            cache = ScanCache(cache_dir, os.path.abspath(root))
+            cache.load()
+        modules.extend(_scan_root(root, seen, cache, workers))
+        if cache is not None:
+            cache.save()
+    return modules
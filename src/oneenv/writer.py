@@ -0,0 +1,122 @@
+"""
+OneEnv Output Writer
+生成ファイルの書き込み
+
+Writes generated files atomically (temporary file + rename) and can leave the
+destination untouched when its content would not change, so that file
+watchers, build caches and make targets only see real changes.
+生成ファイルを一時ファイル経由でアトミックに書き込み、内容が変わらない場合は
+書き込み先に触れずに済ませます。ファイル監視やビルドキャッシュが実際の変更のみを
+検知できるようにします。
+"""
+
+import hashlib
+import os
+import secrets
+import shutil
+import tempfile
+from typing import Iterable, Iterator, Optional, Union
+
+# Existing files are hashed in blocks of this many bytes
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def _encode(chunks: Iterable[str], encoding: str) -> Iterator[bytes]:
+    """Encode text as open(path, 'w') would, including newline translation"""
+    for chunk in chunks:
+        if os.linesep != "\n":
+            chunk = chunk.replace("\n", os.linesep)
+        yield chunk.encode(encoding)
+
+
+def file_digest(path: str, size: int) -> Optional[bytes]:
+    """
+    SHA-256 of the file at `path`, or None if it is missing or not `size` bytes
+    ファイルのSHA-256（存在しない・サイズが異なる場合はNone）
+
+    The size is compared first so that a changed file is usually detected
+    without reading it.
+    """
+    try:
+        if os.path.getsize(path) != size:
+            return None
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        return digest.digest()
+    except OSError:
+        return None
+
+
+def _replace(path: str, blocks: Iterable[bytes]) -> None:
+    """Write `blocks` to a temporary sibling of `path` and rename it over `path`"""
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{name}.{secrets.token_hex(6)}.tmp")
+    try:
+        # Created with open() rather than mkstemp() so the new file gets the usual umask mode
+        with open(tmp_path, 'xb') as f:
+            for block in blocks:
+                f.write(block)
+
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_text(path: str, content: Union[str, Iterable[str]], encoding: str = 'utf-8',
+               skip_unchanged: bool = True) -> bool:
+    """
+    Atomically write text to `path`
+    テキストをアトミックに書き込む
+
+    The content is written to a temporary file next to `path` and renamed over
+    it, so readers never see a partial file. An existing file keeps its
+    permission bits. With skip_unchanged, streamed content is first spooled
+    and hashed elsewhere, so an unchanged destination directory is not touched.
+
+    Args:
+        path: Destination file (a symlink is followed and its target replaced)
+        content: The text, or an iterable of chunks (streamed with bounded memory)
+        encoding: Text encoding
+        skip_unchanged: Leave `path` untouched (content and mtime) when it
+            already holds exactly this content
+
+    Returns:
+        True if the file was written, False if it was already up to date
+
+    Raises:
+        OSError: The file or its temporary sibling could not be written
+    """
+    path = os.path.realpath(path)
+
+    if isinstance(content, str):
+        data = b"".join(_encode((content,), encoding))
+        if skip_unchanged and file_digest(path, len(data)) == hashlib.sha256(data).digest():
+            return False
+        blocks: Iterable[bytes] = (data,)
+    elif skip_unchanged:
+        # Spool the stream (in memory up to HASH_BLOCK_SIZE, then in the system
+        # temporary directory) so that nothing is created next to an unchanged file
+        with tempfile.SpooledTemporaryFile(max_size=HASH_BLOCK_SIZE) as spool:
+            digest = hashlib.sha256()
+            size = 0
+            for block in _encode(content, encoding):
+                spool.write(block)
+                digest.update(block)
+                size += len(block)
+            if file_digest(path, size) == digest.digest():
+                return False
+            spool.seek(0)
+            _replace(path, iter(lambda: spool.read(HASH_BLOCK_SIZE), b""))
+        return True
+    else:
+        blocks = _encode(content, encoding)
+
+    _replace(path, blocks)
+    return True
+
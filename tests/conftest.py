@@ -0,0 +1,52 @@
+"""
+Shared test helpers: a fake entry point and sample template functions
+"""
+
+
+class FakeEntryPoint:
+    """Minimal stand-in for importlib.metadata.EntryPoint that counts loads"""
+
+    def __init__(self, name, func, value=None):
+        self.name = name
+        self.value = value or f"fake_plugins.{name}:template"
+        self.func = func
+        self.load_count = 0
+
+    def load(self):
+        self.load_count += 1
+        return self.func
+
+
+def database_template():
+    return [
+        {
+            "category": "Database",
+            "option": "sqlite",
+            "env": {
+                "DATABASE_URL": {
+                    "description": "SQLite database URL",
+                    "default": "sqlite:///app.db",
+                    "required": True
+                }
+            }
+        }
+    ]
+
+
+def cache_template():
+    return [
+        {"category": "Cache", "option": "redis",
+         "env": {"REDIS_URL": {"description": "Redis URL", "importance": "critical"},
+                 "REDIS_PASSWORD": {"description": "Redis password"}}},
+        {"category": "Queue", "option": "redis",
+         "env": {"REDIS_URL": {"description": "Queue Redis URL"}}},
+    ]
+
+
+def legacy_template():
+    return {
+        "LEGACY_VAR": {
+            "description": "Legacy variable",
+            "default": "legacy"
+        }
+    }
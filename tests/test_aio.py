@@ -0,0 +1,87 @@
+"""
+Tests for the asyncio API
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import oneenv
+from oneenv.core import ScaffoldingTemplateProcessor
+from conftest import FakeEntryPoint, database_template
+
+
+class TestAsyncDotenv:
+    """Test awaitable .env loading"""
+
+    def test_dotenv_values_gathered(self, tmp_path):
+        paths = []
+        for i in range(5):
+            path = tmp_path / f".env.{i}"
+            path.write_text(f"AIO_VALUE_{i}={i}\n")
+            paths.append(str(path))
+
+        async def load_all():
+            return await asyncio.gather(*(oneenv.adotenv_values(path) for path in paths))
+
+        results = asyncio.run(load_all())
+
+        assert results == [{f"AIO_VALUE_{i}": str(i)} for i in range(5)]
+
+    def test_aload_dotenv(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("AIO_LOADED", raising=False)
+        path = tmp_path / ".env"
+        path.write_text("AIO_LOADED=yes\n")
+
+        assert asyncio.run(oneenv.aload_dotenv(str(path))) is True
+        assert os.environ["AIO_LOADED"] == "yes"
+        monkeypatch.delenv("AIO_LOADED")
+
+    def test_named_environment(self, tmp_path):
+        path = tmp_path / ".env.aio"
+        path.write_text("AIO_NAMED=named\n")
+        environment = oneenv.NamedEnvironment("aio")
+
+        assert asyncio.run(environment.aload_dotenv(str(path))) is True
+        assert environment.get("AIO_NAMED") == "named"
+
+
+class TestAsyncTemplates:
+    """Test awaitable generation and catalogue warm-up"""
+
+    def test_work_runs_off_the_loop(self, monkeypatch):
+        from unittest.mock import patch
+        from oneenv import core
+        processor = ScaffoldingTemplateProcessor()
+        monkeypatch.setattr(core, "_scaffolding_processor", processor)
+        threads = []
+
+        def template():
+            threads.append(threading.current_thread())
+            return database_template()
+
+        ep = FakeEntryPoint("database", template)
+
+        async def generate():
+            await oneenv.awarm_up_templates()
+            return await asyncio.gather(*(
+                oneenv.agenerate_template("", [{"category": "Database"}]) for _ in range(4)
+            ))
+
+        with patch('oneenv.core.entry_points', return_value=[ep]):
+            results = asyncio.run(generate())
+
+        assert threads and threads[0] is not threading.main_thread()
+        assert ep.load_count == 1
+        assert len(set(results)) == 1 and "SQLITE_DATABASE_URL=" in results[0]
+
+    def test_generate_env_example_skip_unchanged(self, tmp_path):
+        path = str(tmp_path / ".env.example")
+
+        assert asyncio.run(oneenv.agenerate_env_example(path, skip_unchanged=True)) is True
+        mtime = os.stat(path).st_mtime_ns
+        assert asyncio.run(oneenv.agenerate_env_example(path, skip_unchanged=True)) is False
+        assert os.stat(path).st_mtime_ns == mtime
@@ -0,0 +1,511 @@
+"""
+Tests for entry-point discovery and the persistent registry cache
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from oneenv import discovery
+from oneenv.discovery import RegistryCache, load_entry_point_results
+from conftest import FakeEntryPoint, database_template, legacy_template
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ONEENV_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(discovery, "distributions_fingerprint", lambda: "fingerprint-1")
+    return tmp_path
+
+
+class TestRegistryCache:
+    """Test the persistent registry cache"""
+
+    def test_no_cache_without_env(self, monkeypatch):
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+        ep = FakeEntryPoint("database", database_template)
+
+        load_entry_point_results([ep])
+        load_entry_point_results([ep])
+
+        assert ep.load_count == 2
+
+    def test_warm_run_does_not_load_plugins(self, cache_dir):
+        ep = FakeEntryPoint("database", database_template)
+        cold = load_entry_point_results([ep])
+
+        warm_ep = FakeEntryPoint("database", database_template)
+        warm = load_entry_point_results([warm_ep])
+
+        assert ep.load_count == 1
+        assert warm_ep.load_count == 0
+        assert warm[0].cached is True
+        assert warm[0].result == cold[0].result
+
+    def test_fingerprint_change_invalidates(self, cache_dir, monkeypatch):
+        load_entry_point_results([FakeEntryPoint("database", database_template)])
+
+        monkeypatch.setattr(discovery, "distributions_fingerprint", lambda: "fingerprint-2")
+        ep = FakeEntryPoint("database", database_template)
+        results = load_entry_point_results([ep])
+
+        assert ep.load_count == 1
+        assert results[0].cached is False
+
+    def test_failures_and_non_json_results_are_not_cached(self, cache_dir):
+        def broken():
+            raise RuntimeError("boom")
+
+        eps = [
+            FakeEntryPoint("broken", broken),
+            FakeEntryPoint("opaque", lambda: {"VAR": object()}),
+            FakeEntryPoint("legacy", legacy_template),
+        ]
+        results = load_entry_point_results(eps)
+        assert isinstance(results[0].error, RuntimeError)
+
+        entries = RegistryCache(str(cache_dir), "oneenv.templates").load("fingerprint-1")
+        assert list(entries) == ["legacy=fake_plugins.legacy:template"]
+
+    def test_core_uses_cache(self, cache_dir):
+        from oneenv.core import OneEnvCore, ScaffoldingTemplateProcessor
+        from unittest.mock import patch
+
+        eps = [FakeEntryPoint("legacy", legacy_template),
+               FakeEntryPoint("database", database_template)]
+        with patch('oneenv.core.entry_points', return_value=eps):
+            OneEnvCore().discover_entry_point_templates()
+
+        warm_eps = [FakeEntryPoint("legacy", legacy_template),
+                    FakeEntryPoint("database", database_template)]
+        with patch('oneenv.core.entry_points', return_value=warm_eps):
+            templates = OneEnvCore().discover_entry_point_templates()
+            processor = ScaffoldingTemplateProcessor()
+            processor.load_all_scaffolding_templates()
+
+        assert [ep.load_count for ep in warm_eps] == [0, 0]
+        assert templates[0].source == "plugin:legacy"
+        assert processor.get_template_structure() == {"Database": ["sqlite"]}
+
+
+class TestConcurrentLoading:
+    """Test concurrent entry-point loading with per-plugin timeouts"""
+
+    def test_results_keep_entry_point_order(self, monkeypatch):
+        import time
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+
+        def make_template(index):
+            def template():
+                # Later plugins finish first
+                time.sleep(0.01 * (5 - index))
+                return {f"VAR_{index}": {"description": f"Variable {index}"}}
+            return template
+
+        eps = [FakeEntryPoint(f"plugin{i}", make_template(i)) for i in range(5)]
+        serial = load_entry_point_results(eps, max_workers=1)
+        concurrent = load_entry_point_results(eps, max_workers=4)
+
+        assert [r.name for r in concurrent] == [f"plugin{i}" for i in range(5)]
+        assert [r.result for r in concurrent] == [r.result for r in serial]
+
+    def test_hung_plugin_is_skipped(self, monkeypatch, capsys):
+        import threading
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+        release = threading.Event()
+
+        def hung():
+            release.wait(5)
+            return legacy_template()
+
+        eps = [
+            FakeEntryPoint("hung", hung),
+            FakeEntryPoint("legacy", legacy_template),
+            FakeEntryPoint("database", database_template),
+        ]
+        try:
+            results = load_entry_point_results(eps, max_workers=1, timeout=0.1)
+        finally:
+            release.set()
+
+        assert isinstance(results[0].error, TimeoutError)
+        assert results[1].result == legacy_template()
+        assert results[2].result == database_template()
+        assert "Skipping template plugin hung" in capsys.readouterr().err
+
+    def test_workers_from_environment(self, monkeypatch):
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+        monkeypatch.setenv("ONEENV_DISCOVERY_WORKERS", "3")
+        calls = []
+        monkeypatch.setattr(discovery, "_load_concurrently",
+                            lambda eps, workers, timeout: calls.append(workers) or
+                            [(ep.load()(), None) for ep in eps])
+
+        load_entry_point_results([FakeEntryPoint("legacy", legacy_template)])
+
+        assert calls == [3]
+
+
+class TestAsyncTemplates:
+    """Test coroutine template functions"""
+
+    @staticmethod
+    def make_async_template(index, delay=0.2):
+        import asyncio
+
+        async def template():
+            await asyncio.sleep(delay)
+            return {f"ASYNC_VAR_{index}": {"description": f"Async variable {index}"}}
+        return template
+
+    def test_coroutines_are_gathered(self, monkeypatch):
+        import time
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+        eps = [FakeEntryPoint(f"async{i}", self.make_async_template(i)) for i in range(5)]
+        eps.append(FakeEntryPoint("legacy", legacy_template))
+
+        started = time.monotonic()
+        results = load_entry_point_results(eps)
+        elapsed = time.monotonic() - started
+
+        assert elapsed < 0.8  # about one delay, not five
+        assert [r.result for r in results[:5]] == [
+            {f"ASYNC_VAR_{i}": {"description": f"Async variable {i}"}} for i in range(5)
+        ]
+        assert results[5].result == legacy_template()
+
+    def test_async_timeout_and_errors(self, monkeypatch):
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        eps = [FakeEntryPoint("slow", self.make_async_template(0, delay=5)),
+               FakeEntryPoint("broken", broken),
+               FakeEntryPoint("fast", self.make_async_template(1, delay=0))]
+        results = load_entry_point_results(eps, timeout=0.1)
+
+        assert isinstance(results[0].error, TimeoutError)
+        assert isinstance(results[1].error, RuntimeError)
+        assert results[2].result == {"ASYNC_VAR_1": {"description": "Async variable 1"}}
+
+    def test_called_from_running_loop(self, monkeypatch):
+        import asyncio
+        from unittest.mock import patch
+        from oneenv.core import ScaffoldingTemplateProcessor
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+
+        async def async_database_template():
+            await asyncio.sleep(0)
+            return database_template()
+
+        ep = FakeEntryPoint("database", async_database_template)
+        processor = ScaffoldingTemplateProcessor()
+
+        async def main():
+            with patch('oneenv.core.entry_points', return_value=[ep]):
+                processor.load_all_scaffolding_templates()
+
+        asyncio.run(main())
+
+        assert processor.get_template_structure() == {"Database": ["sqlite"]}
+
+
+class TestSharedDiscovery:
+    """Test the single discovery pass shared by both processors"""
+
+    def test_each_entry_point_loaded_once(self, monkeypatch):
+        from unittest.mock import patch
+        from oneenv.core import OneEnvCore, ScaffoldingTemplateProcessor
+        from oneenv.discovery import EntryPointDiscovery
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+
+        calls = []
+
+        def counted(name, func):
+            def template():
+                calls.append(name)
+                return func()
+            return template
+
+        eps = [FakeEntryPoint("legacy", counted("legacy", legacy_template)),
+               FakeEntryPoint("database", counted("database", database_template))]
+        shared = EntryPointDiscovery()
+        core = OneEnvCore(discovery=shared)
+        processor = ScaffoldingTemplateProcessor(discovery=shared)
+
+        with patch('oneenv.core.entry_points', return_value=eps):
+            templates = core.discover_entry_point_templates()
+            processor.load_all_scaffolding_templates()
+            collection = core.collect_all_templates(discover_legacy=False)
+
+        assert calls == ["legacy", "database"]
+        assert [t.source for t in templates] == ["plugin:legacy"]
+        assert list(collection.get_merged_variables()) == ["LEGACY_VAR"]
+        assert processor.get_template_structure() == {"Database": ["sqlite"]}
+
+    def test_kind_classification(self):
+        from oneenv.discovery import LoadedEntryPoint
+
+        assert LoadedEntryPoint("a", database_template(), None).kind == "scaffolding"
+        assert LoadedEntryPoint("b", legacy_template(), None).kind == "legacy"
+        assert LoadedEntryPoint("c", {"groups": {}}, None).kind == "groups"
+        assert LoadedEntryPoint("d", None, ValueError("x")).kind == "error"
+
+    def test_global_processors_share_engine(self):
+        from oneenv.core import _oneenv_core, _scaffolding_processor
+
+        assert _oneenv_core.discovery is _scaffolding_processor.discovery
+
+
+class TestAdvertisedStructure:
+    """Test the metadata-only category index"""
+
+    @pytest.fixture
+    def plugin_dir(self, tmp_path, monkeypatch):
+        import json
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+        package = tmp_path / "advertised_plugin"
+        package.mkdir()
+        (package / "__init__.py").write_text("")
+        (package / "templates.py").write_text("")
+        (package / "oneenv.json").write_text(json.dumps({
+            "templates": {"database_template": {"Database": ["sqlite"]}}
+        }))
+        monkeypatch.syspath_prepend(str(tmp_path))
+        return package
+
+    def test_read_advertised_structure(self, plugin_dir):
+        from oneenv.discovery import read_advertised_structure
+
+        ep = FakeEntryPoint("database", database_template,
+                            "advertised_plugin.templates:database_template")
+        missing = FakeEntryPoint("other", database_template,
+                                 "advertised_plugin.templates:other_template")
+
+        assert read_advertised_structure(ep) == {"Database": ["sqlite"]}
+        assert read_advertised_structure(missing) is None
+        assert ep.load_count == 0
+
+    def test_top_level_module_does_not_use_shared_directory(self, tmp_path, monkeypatch):
+        import json
+        from oneenv.discovery import read_advertised_structure
+        (tmp_path / "single_module_plugin.py").write_text("")
+        (tmp_path / "oneenv.json").write_text(json.dumps({
+            "templates": {"database_template": {"Database": ["sqlite"]}}
+        }))
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        ep = FakeEntryPoint("database", database_template,
+                            "single_module_plugin:database_template")
+
+        assert read_advertised_structure(ep) is None
+
+    def test_read_from_distribution(self, tmp_path):
+        import importlib.metadata
+        import json
+        from oneenv.discovery import read_advertised_structure
+        dist_info = tmp_path / "single_module_plugin-1.0.dist-info"
+        dist_info.mkdir()
+        (dist_info / "METADATA").write_text("Name: single-module-plugin\nVersion: 1.0\n")
+        (dist_info / "entry_points.txt").write_text(
+            "[oneenv.templates]\ndatabase = single_module_plugin:database_template\n"
+        )
+        (dist_info / "oneenv.json").write_text(json.dumps({
+            "templates": {"database_template": {"Database": ["postgres", "sqlite"]}}
+        }))
+
+        ep, = importlib.metadata.Distribution.at(dist_info).entry_points
+
+        assert read_advertised_structure(ep) == {"Database": ["postgres", "sqlite"]}
+
+    def test_structure_queries_do_not_import_advertised_plugins(self, plugin_dir):
+        from unittest.mock import patch
+        from oneenv.core import ScaffoldingTemplateProcessor
+
+        def cache_template():
+            return [{"category": "Cache", "option": "redis",
+                     "env": {"REDIS_URL": {"description": "Redis URL"}}}]
+
+        advertised = FakeEntryPoint("database", database_template,
+                                    "advertised_plugin.templates:database_template")
+        unadvertised = FakeEntryPoint("cache", cache_template)
+        processor = ScaffoldingTemplateProcessor()
+
+        with patch('oneenv.core.entry_points', return_value=[advertised, unadvertised]):
+            processor.load_structure_index()
+
+            assert processor.get_template_structure() == {
+                "Cache": ["redis"], "Database": ["sqlite"]
+            }
+            assert processor.has_category("Database")
+            assert processor.get_options("Database") == ["sqlite"]
+            assert advertised.load_count == 0
+            assert unadvertised.load_count == 1
+
+            processor.load_categories(["Database"])
+            selected = processor.generate_by_selection([{"category": "Database", "option": "sqlite"}])
+
+        assert advertised.load_count == 1
+        assert "DATABASE_URL" in selected
+        assert processor.is_fully_loaded
+        assert [o.category for o in processor.env_options] == ["Database", "Cache"]
+
+
+class TestRefresh:
+    """Test incremental reload of the scaffolding processor"""
+
+    def test_refresh_loads_only_differences(self, monkeypatch):
+        from unittest.mock import patch
+        from oneenv.core import ScaffoldingTemplateProcessor
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+
+        def option_template(category, option):
+            def template():
+                return [{"category": category, "option": option,
+                         "env": {f"{option.upper()}_URL": {"description": f"{option} URL"}}}]
+            return template
+
+        database = FakeEntryPoint("database", option_template("Database", "sqlite"))
+        cache = FakeEntryPoint("cache", option_template("Cache", "redis"))
+        processor = ScaffoldingTemplateProcessor()
+        with patch('oneenv.core.entry_points', return_value=[database, cache]):
+            processor.load_all_scaffolding_templates()
+
+        upgraded_database = FakeEntryPoint("database", option_template("Database", "postgres"),
+                                           "fake_plugins.database:template_v2")
+        queue = FakeEntryPoint("queue", option_template("Queue", "rabbitmq"))
+        with patch('oneenv.core.entry_points', return_value=[upgraded_database, queue]):
+            changes = processor.refresh()
+
+        assert changes == {"added": ["queue"], "changed": ["database"], "removed": ["cache"]}
+        assert processor.get_template_structure() == {
+            "Database": ["postgres"], "Queue": ["rabbitmq"]
+        }
+        assert database.load_count == 1 and cache.load_count == 1
+
+        with patch('oneenv.core.entry_points', return_value=[upgraded_database, queue]):
+            assert processor.refresh() == {"added": [], "changed": [], "removed": []}
+        assert upgraded_database.load_count == 1 and queue.load_count == 1
+
+
+    def test_refresh_reimports_upgraded_module(self, tmp_path, monkeypatch):
+        import importlib.metadata
+        from unittest.mock import patch
+        from oneenv.core import ScaffoldingTemplateProcessor
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+        monkeypatch.setattr(sys, "dont_write_bytecode", True)
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        package = tmp_path / "refresh_plugin"
+        package.mkdir()
+        (package / "__init__.py").write_text("")
+        (package / "templates.py").write_text(
+            "from .options import OPTION\n\n"
+            "def template():\n"
+            "    return [{'category': 'Database', 'option': OPTION,\n"
+            "             'env': {'DATABASE_URL': {'description': 'Database URL'}}}]\n"
+        )
+
+        def install(version, option):
+            for old in tmp_path.glob("refresh_plugin-*.dist-info"):
+                for path in old.iterdir():
+                    path.unlink()
+                old.rmdir()
+            dist_info = tmp_path / f"refresh_plugin-{version}.dist-info"
+            dist_info.mkdir()
+            (dist_info / "METADATA").write_text(f"Name: refresh-plugin\nVersion: {version}\n")
+            (dist_info / "entry_points.txt").write_text(
+                "[oneenv.templates]\nplug = refresh_plugin.templates:template\n"
+            )
+            (package / "options.py").write_text(f"OPTION = {option!r}\n")
+            return list(importlib.metadata.Distribution.at(dist_info).entry_points)
+
+        processor = ScaffoldingTemplateProcessor()
+        try:
+            with patch('oneenv.core.entry_points', return_value=install("1.0", "sqlite")):
+                processor.load_all_scaffolding_templates()
+            assert processor.get_template_structure() == {"Database": ["sqlite"]}
+
+            with patch('oneenv.core.entry_points', return_value=install("2.0", "postgres")):
+                changes = processor.refresh()
+
+            assert changes == {"added": [], "changed": ["plug"], "removed": []}
+            assert processor.get_template_structure() == {"Database": ["postgres"]}
+        finally:
+            for name in [name for name in sys.modules if name.split(".")[0] == "refresh_plugin"]:
+                del sys.modules[name]
+
+
+class TestThreadSafety:
+    """Test concurrent first use of the registries"""
+
+    THREADS = 16
+
+    def run_concurrently(self, func):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        barrier = threading.Barrier(self.THREADS)
+
+        def call(_):
+            barrier.wait()
+            return func()
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            return list(pool.map(call, range(self.THREADS)))
+
+    def test_concurrent_first_load_loads_once(self, monkeypatch):
+        import time
+        from unittest.mock import patch
+        from oneenv.core import ScaffoldingTemplateProcessor
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+
+        def slow_template():
+            time.sleep(0.05)
+            return database_template()
+
+        ep = FakeEntryPoint("database", slow_template)
+        processor = ScaffoldingTemplateProcessor()
+
+        def query():
+            processor.ensure_loaded()
+            return (processor.has_category("Database"),
+                    [var for var, _ in processor.generate_by_selection(
+                        [{"category": "Database", "option": "sqlite"}]).items()])
+
+        with patch('oneenv.core.entry_points', return_value=[ep]):
+            results = self.run_concurrently(query)
+
+        assert ep.load_count == 1
+        assert results == [(True, ["DATABASE_URL"])] * self.THREADS
+        assert len(processor.env_options) == 1
+
+    def test_readers_see_complete_snapshot_during_refresh(self, monkeypatch):
+        from unittest.mock import patch
+        from oneenv.core import ScaffoldingTemplateProcessor
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+
+        ep = FakeEntryPoint("database", database_template)
+        processor = ScaffoldingTemplateProcessor()
+        with patch('oneenv.core.entry_points', return_value=[ep]):
+            processor.load_all_scaffolding_templates()
+
+            def query():
+                processor.load_all_scaffolding_templates()
+                return processor.get_template_structure()
+
+            results = self.run_concurrently(query)
+
+        assert results == [{"Database": ["sqlite"]}] * self.THREADS
+
+    def test_env_returns_one_instance(self):
+        import oneenv
+
+        name = "thread-safety-test"
+        oneenv._named_environments.pop(name, None)
+        instances = self.run_concurrently(lambda: oneenv.env(name))
+
+        assert all(instance is instances[0] for instance in instances)
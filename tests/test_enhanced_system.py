@@ -194,6 +194,78 @@ class TestTemplateCollection:
         assert "データベース接続URL" in description
         assert "Database connection string for the application" in description
         assert "From package-b:" in description
+    
+    def test_merge_uses_records_without_validation(self):
+        """Test that merging builds lightweight records instead of models"""
+        from oneenv.models import EnvVarRecord
+        collection = TemplateCollection()
+        shared = EnvVarConfig(description="Shared", default="a", choices=["a", "b"], group="G")
+        collection.add_template(EnvTemplate(variables={"SHARED": shared}, source="package-a"))
+        collection.add_template(EnvTemplate(
+            variables={"SHARED": EnvVarConfig(description="Other"),
+                       "ONLY_B": EnvVarConfig(description="Only b")},
+            source="package-b"
+        ))
+        
+        with patch.object(EnvVarConfig, "__init__", side_effect=AssertionError("validated")):
+            records = collection.get_merged_records()
+            merged = collection.get_merged_variables()
+        
+        assert isinstance(records["SHARED"]["config"], EnvVarRecord)
+        assert records["SHARED"]["config"].choices == ("a", "b")
+        assert merged["SHARED"]["config"].choices == ["a", "b"]
+        assert merged["SHARED"]["config"].description == "Shared\n\n# From package-b:\nOther"
+        assert merged["SHARED"]["sources"] == ["package-a", "package-b"]
+        assert merged["ONLY_B"]["config"] is collection.templates[1].variables["ONLY_B"]
+        assert collection.get_grouped_records()["important"]["G"]["SHARED"] == records["SHARED"]
+    
+    def test_merge_index_is_incremental(self):
+        """Test that views come from the index maintained by add_template"""
+        collection = TemplateCollection()
+        collection.add_template(EnvTemplate(
+            variables={"SHARED": EnvVarConfig(description="First"),
+                       "ONLY_A": EnvVarConfig(description="A", importance="critical")},
+            source="package-a"
+        ))
+        assert collection.get_duplicate_variables() == {}
+        
+        with patch.object(TemplateCollection, "_index_template",
+                          wraps=collection._index_template) as indexed:
+            collection.add_template(EnvTemplate(
+                variables={"SHARED": EnvVarConfig(description="Second")}, source="package-b"
+            ))
+            collection.get_merged_variables()
+            collection.get_duplicate_variables()
+            collection.get_grouped_variables()
+        
+        assert indexed.call_count == 1
+        assert collection.get_duplicate_variables() == {"SHARED": ["package-a", "package-b"]}
+        assert list(collection.get_grouped_variables()["critical"]["General"]) == ["ONLY_A"]
+        
+        # Templates appended to the list directly are picked up too
+        collection.templates.append(EnvTemplate(
+            variables={"ONLY_A": EnvVarConfig(description="C")}, source="package-c"
+        ))
+        assert collection.get_duplicate_variables()["ONLY_A"] == ["package-a", "package-c"]
+        
+        # Replacing the list rebuilds the index
+        collection.templates = collection.templates[:1]
+        assert collection.get_duplicate_variables() == {}
+    
+    def test_description_merging_deduplicates_per_source(self):
+        """Test that descriptions are kept once each, in source order"""
+        collection = TemplateCollection()
+        descriptions = ["Log level", "Logging verbosity", "Log level", "Logging verbosity"]
+        for i, description in enumerate(descriptions * 50):
+            collection.add_template(EnvTemplate(
+                variables={"LOG_LEVEL": EnvVarConfig(description=description)},
+                source=f"plugin-{i}"
+            ))
+        
+        merged = collection.get_merged_variables()["LOG_LEVEL"]
+        
+        assert merged["config"].description == "Log level\n\n# From plugin-1:\nLogging verbosity"
+        assert len(merged["sources"]) == 200
 
 
 class TestOneEnvCore:
@@ -0,0 +1,228 @@
+"""
+Tests for the catalogue indexes
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from oneenv.indexes import VariableIndex, VariableLocation
+from conftest import FakeEntryPoint, cache_template
+
+
+class TestVariableIndex:
+    """Test exact and prefix lookups"""
+
+    def test_lookup(self):
+        index = VariableIndex([
+            VariableLocation("REDIS_URL", "cache", "Cache", "redis", "critical"),
+            VariableLocation("REDIS_PASSWORD", "cache", "Cache", "redis", "important"),
+            VariableLocation("REDISX", "other", None, None, "optional"),
+            VariableLocation("REDIS_URL", "queue", "Queue", "redis", "important"),
+        ])
+
+        assert [loc.source for loc in index.lookup("REDIS_URL")] == ["cache", "queue"]
+        assert index.lookup("MISSING") == []
+        assert [loc.variable for loc in index.lookup_prefix("REDIS_")] == [
+            "REDIS_PASSWORD", "REDIS_URL", "REDIS_URL"
+        ]
+        assert len(index) == 3 and "REDISX" in index
+
+
+class TestFindVariable:
+    """Test the variable lookup API"""
+
+    @pytest.fixture
+    def processor(self, monkeypatch):
+        from oneenv.core import ScaffoldingTemplateProcessor
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+        processor = ScaffoldingTemplateProcessor()
+        with patch('oneenv.core.entry_points', return_value=[FakeEntryPoint("cache", cache_template)]):
+            processor.load_all_scaffolding_templates()
+        return processor
+
+    def test_processor_index_records_sources(self, processor):
+        locations = processor.get_variable_index().lookup("REDIS_URL")
+
+        assert locations == [
+            VariableLocation("REDIS_URL", "cache", "Cache", "redis", "critical"),
+            VariableLocation("REDIS_URL", "cache", "Queue", "redis", "important"),
+        ]
+
+    def test_find_variable_includes_legacy_templates(self, processor):
+        from oneenv.core import OneEnvCore, find_variable
+
+        core = OneEnvCore()
+        core.register_legacy_function(
+            lambda: {"REDIS_URL": {"description": "App Redis URL", "importance": "optional"}}
+        )
+        with patch('oneenv.core._scaffolding_processor', processor), \
+                patch('oneenv.core._oneenv_core', core), \
+                patch('oneenv.core.entry_points', return_value=[]):
+            exact = find_variable("REDIS_URL")
+            prefix = find_variable("REDIS_", prefix=True, include_legacy=False)
+
+        assert [(loc.category, loc.importance) for loc in exact] == [
+            ("Cache", "critical"), ("Queue", "important"), (None, "optional")
+        ]
+        assert [loc.variable for loc in prefix] == ["REDIS_PASSWORD", "REDIS_URL", "REDIS_URL"]
+
+    def test_legacy_index_is_cached(self, processor):
+        from oneenv.core import OneEnvCore, find_variable
+
+        calls = []
+
+        def app_template():
+            calls.append("app")
+            return {"POOL_SIZE": {"description": "Pool size"}}
+
+        core = OneEnvCore()
+        core.register_legacy_function(app_template)
+        with patch('oneenv.core._scaffolding_processor', processor), \
+                patch('oneenv.core._oneenv_core', core), \
+                patch('oneenv.core.entry_points', return_value=[]):
+            for _ in range(3):
+                assert [loc.source for loc in find_variable("POOL_SIZE")] == ["app_template"]
+            assert calls == ["app"]
+
+            core.register_legacy_function(lambda: {"POOL_TIMEOUT": {"description": "Timeout"}})
+            assert [loc.variable for loc in find_variable("POOL_", prefix=True)] == [
+                "POOL_SIZE", "POOL_TIMEOUT"
+            ]
+            core.clear_legacy_registry()
+            assert find_variable("POOL_SIZE") == []
+
+    def test_find_variable_invalid_name(self):
+        from oneenv.core import find_variable
+
+        with pytest.raises(TypeError):
+            find_variable(None)
+        with pytest.raises(ValueError):
+            find_variable("  ")
+
+
+class TestSearchIndex:
+    """Test the full-text search index"""
+
+    @pytest.fixture
+    def index(self):
+        from oneenv.indexes import SearchIndex
+        return SearchIndex([
+            (VariableLocation("DATABASE_POOL_SIZE", "db", "Database", "postgres", "optional"),
+             "Connection pool size"),
+            (VariableLocation("DATABASE_URL", "db", "Database", "postgres", "critical"),
+             "PostgreSQL connection URL"),
+            (VariableLocation("REDIS_MAX_CONNECTIONS", "cache", "Cache", "redis", "optional"),
+             "Maximum pooled connections"),
+        ])
+
+    def test_all_terms_must_match(self, index):
+        results = index.search("connection pool")
+
+        assert [r.location.variable for r in results] == [
+            "DATABASE_POOL_SIZE", "REDIS_MAX_CONNECTIONS"
+        ]
+        assert results[0].score > results[1].score
+
+    def test_name_and_category_hits_rank_first(self, index):
+        results = index.search("postgres")
+
+        assert {r.location.variable for r in results} == {"DATABASE_POOL_SIZE", "DATABASE_URL"}
+        assert [r.location.variable for r in index.search("postgresql")] == ["DATABASE_URL"]
+        # "pool" is in DATABASE_POOL_SIZE's name but only a prefix of "pooled" for redis
+        assert [r.location.variable for r in index.search("pool")] == [
+            "DATABASE_POOL_SIZE", "REDIS_MAX_CONNECTIONS"
+        ]
+
+    def test_non_ascii_descriptions(self):
+        from oneenv.indexes import SearchIndex, tokenize
+        index = SearchIndex([
+            (VariableLocation("REDIS_POOL_SIZE", "cache", "Cache", "redis", "optional"),
+             "Redis接続プールサイズ"),
+            (VariableLocation("CAFE_MODE", "app", None, None, "optional"), "Mode du café"),
+        ])
+
+        assert tokenize("Redis接続") == ["redis", "接続"]
+        assert [r.location.variable for r in index.search("接続")] == ["REDIS_POOL_SIZE"]
+        assert [r.location.variable for r in index.search("プール redis")] == ["REDIS_POOL_SIZE"]
+        assert [r.location.variable for r in index.search("café")] == ["CAFE_MODE"]
+        assert index.search("接続数") == []
+
+    def test_no_match_and_limit(self, index):
+        assert index.search("kafka") == []
+        assert index.search("!!") == []
+        assert len(index.search("conn", limit=1)) == 1
+
+    def test_search_templates_api(self, monkeypatch):
+        from oneenv.core import ScaffoldingTemplateProcessor, search_templates
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+        processor = ScaffoldingTemplateProcessor()
+        with patch('oneenv.core.entry_points', return_value=[FakeEntryPoint("cache", cache_template)]):
+            processor.load_all_scaffolding_templates()
+            with patch('oneenv.core._scaffolding_processor', processor):
+                results = search_templates("queue redis", include_legacy=False)
+
+        assert [(r.location.variable, r.location.category, r.location.source) for r in results] == [
+            ("REDIS_URL", "Queue", "cache")
+        ]
+
+    def test_search_templates_builds_one_index(self, monkeypatch):
+        from oneenv.core import OneEnvCore, ScaffoldingTemplateProcessor, search_templates
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+        calls = []
+
+        def app_template():
+            calls.append("app")
+            return {"APP_REDIS_URL": {"description": "Redis URL used by the app"}}
+
+        core = OneEnvCore()
+        core.register_legacy_function(app_template)
+        processor = ScaffoldingTemplateProcessor()
+        with patch('oneenv.core.entry_points', return_value=[FakeEntryPoint("cache", cache_template)]):
+            processor.load_all_scaffolding_templates()
+            with patch('oneenv.core._scaffolding_processor', processor), \
+                    patch('oneenv.core._oneenv_core', core):
+                first = search_templates("redis url")
+                second = search_templates("redis url")
+
+        assert calls == ["app"]
+        assert first == second
+        assert {r.location.variable for r in first} == {"REDIS_URL", "APP_REDIS_URL"}
+
+
+
+class TestSearchCli:
+    """Test the 'oneenv search' command"""
+
+    def test_search_imports_templates(self, tmp_path, monkeypatch, capsys):
+        from oneenv import cli
+        (tmp_path / "search_cli_settings.py").write_text(
+            "from oneenv import oneenv\n\n"
+            "@oneenv\n"
+            "def search_cli_template():\n"
+            "    return {'SEARCH_CLI_POOL_SIZE': {'description': 'Worker pool size'}}\n"
+        )
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.delitem(sys.modules, "search_cli_settings", raising=False)
+        monkeypatch.setattr(sys, "argv", ["oneenv", "search", "worker", "pool", "--scan", "ast"])
+
+        cli.main()
+
+        output = capsys.readouterr().out
+        assert "SEARCH_CLI_POOL_SIZE  (legacy template) from search_cli_template" in output
+
+    @pytest.mark.parametrize("limit", ["0", "-1", "many"])
+    def test_search_rejects_invalid_limit(self, limit, monkeypatch, capsys):
+        from oneenv import cli
+        monkeypatch.setattr(sys, "argv", ["oneenv", "search", "pool", "-n", limit])
+
+        with pytest.raises(SystemExit) as exc_info:
+            cli.main()
+
+        assert exc_info.value.code == 2
+        assert "--limit" in capsys.readouterr().err
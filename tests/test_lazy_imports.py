@@ -0,0 +1,103 @@
+"""
+Tests that importing oneenv does not load the template system eagerly
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+HEAVY_MODULES = ["pydantic", "oneenv.core", "oneenv.models", "oneenv.info_api",
+                 "difflib", "pkgutil", "importlib.metadata"]
+
+
+def run_python(code):
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(SRC_DIR))
+    result = subprocess.run([sys.executable, "-c", textwrap.dedent(code)],
+                            capture_output=True, text=True, env=env)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+class TestLazyImports:
+    """Test the lazy top-level imports of the oneenv package"""
+
+    def test_runtime_path_does_not_import_template_system(self, tmp_path):
+        dotenv_file = tmp_path / ".env"
+        dotenv_file.write_text("LAZY_VAR=1\n")
+        output = run_python(f"""
+            import sys
+            import oneenv
+            oneenv.load_dotenv({str(dotenv_file)!r})
+            oneenv.dotenv_values({str(dotenv_file)!r})
+            oneenv.env("lazy").load_dotenv({str(dotenv_file)!r})
+            print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))
+        """)
+        assert output.strip() == ""
+
+    def test_decorated_functions_reach_core_when_loaded_later(self):
+        output = run_python("""
+            import sys
+            import oneenv
+
+            @oneenv.oneenv
+            def lazy_template():
+                return {"LAZY_TEMPLATE_VAR": {"description": "Lazy"}}
+
+            assert "oneenv.core" not in sys.modules
+            print(sorted(oneenv.collect_templates()))
+        """)
+        assert output.strip() == "['LAZY_TEMPLATE_VAR']"
+
+    def test_public_names_resolve_on_access(self):
+        import oneenv
+        from oneenv import core, info_api
+
+        assert oneenv.generate_template is core.generate_template
+        assert oneenv.get_structure_info is info_api.get_structure_info
+        assert "has_category" in dir(oneenv)
+
+    def test_star_import_includes_lazy_names(self):
+        output = run_python("""
+            from oneenv import *
+            print(generate_template.__module__, get_structure_info.__module__,
+                  has_category.__name__, load_dotenv.__module__, callable(env))
+        """)
+        assert output.split() == ["oneenv.core", "oneenv.info_api", "has_category",
+                                  "oneenv", "True"]
+
+
+class TestCliStartup:
+    """Test that CLI subcommands only import what they use"""
+
+    def check_cli_imports(self, argv):
+        return run_python(f"""
+            import sys
+            from oneenv import cli
+            sys.argv = ["oneenv"] + {argv!r}
+            try:
+                cli.main()
+            except SystemExit:
+                pass
+            print("IMPORTED:" + ",".join(m for m in ["pydantic", "oneenv.core"] if m in sys.modules))
+        """)
+
+    def test_diff_does_not_import_pydantic(self, tmp_path):
+        previous = tmp_path / "previous.env"
+        current = tmp_path / "current.env"
+        previous.write_text("A=1\n")
+        current.write_text("A=2\n")
+
+        output = self.check_cli_imports(["diff", str(previous), str(current)])
+
+        assert "~ A=1 → A=2" in output
+        assert output.strip().endswith("IMPORTED:")
+
+    def test_help_does_not_import_pydantic(self):
+        output = self.check_cli_imports(["--help"])
+
+        assert "diff" in output
+        assert output.strip().endswith("IMPORTED:")
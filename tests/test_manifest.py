@@ -0,0 +1,100 @@
+"""
+Tests for the [tool.oneenv] template module manifest
+"""
+
+import os
+import sys
+import textwrap
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import oneenv
+from oneenv.manifest import expand_template_manifest, load_template_manifest
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A project whose sys.path contains modules that must not be imported"""
+    files = {
+        "manifest_settings.py": "from oneenv import oneenv\n",
+        "manifest_other.py": "raise RuntimeError('imported an unlisted module')\n",
+        "manifest_pkg/__init__.py": "",
+        "manifest_pkg/db_templates.py": "",
+        "manifest_pkg/cache_templates.py": "",
+        "manifest_pkg/helpers.py": "raise RuntimeError('imported a helper module')\n",
+    }
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    for name in list(sys.modules):
+        if name.startswith("manifest_"):
+            monkeypatch.delitem(sys.modules, name)
+    return tmp_path
+
+
+def write_pyproject(path, body):
+    (path / "pyproject.toml").write_text(textwrap.dedent(body))
+
+
+class TestLoadManifest:
+    """Test reading [tool.oneenv] from pyproject.toml"""
+
+    def test_missing_file_or_section(self, project):
+        assert load_template_manifest() is None
+        write_pyproject(project, """
+            [project]
+            name = "example"
+        """)
+        assert load_template_manifest() is None
+
+    def test_templates_list(self, project):
+        write_pyproject(project, """
+            [tool.oneenv]
+            templates = ["manifest_settings", "manifest_pkg.*_templates"]
+        """)
+        assert load_template_manifest() == ["manifest_settings", "manifest_pkg.*_templates"]
+
+    def test_invalid_templates(self, project):
+        write_pyproject(project, """
+            [tool.oneenv]
+            templates = "manifest_settings"
+        """)
+        with pytest.raises(ValueError, match="list of module names"):
+            load_template_manifest()
+
+
+class TestExpandManifest:
+    """Test resolving manifest entries to module names"""
+
+    def test_globs_expand_without_importing(self, project):
+        modules = expand_template_manifest(
+            ["manifest_settings", "manifest_pkg.*_templates", "manifest_s*"], [str(project)]
+        )
+
+        assert modules == ["manifest_settings", "manifest_pkg.cache_templates",
+                           "manifest_pkg.db_templates"]
+        assert "manifest_pkg.helpers" not in sys.modules
+
+
+class TestImportTemplatesManifest:
+    """Test import_templates() with a manifest"""
+
+    def test_imports_exactly_listed_modules(self, project, monkeypatch):
+        import pkgutil
+        monkeypatch.setattr(pkgutil, "iter_modules",
+                            lambda *args, **kwargs: pytest.fail("sys.path was scanned"))
+        write_pyproject(project, """
+            [tool.oneenv]
+            templates = ["manifest_settings", "manifest_pkg.*_templates"]
+        """)
+
+        imported = oneenv.import_templates()
+
+        assert imported == ["manifest_settings", "manifest_pkg.cache_templates",
+                            "manifest_pkg.db_templates"]
+        assert "manifest_other" not in sys.modules
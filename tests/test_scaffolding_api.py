@@ -372,6 +372,76 @@ class TestScaffoldingTemplateProcessor:
         assert "CHROMA_HOST" in result
         assert result["DATABASE_URL"]["option"] == "sqlite"
         assert result["CHROMA_HOST"]["option"] == "chroma"
+    
+    def test_find_options_uses_indexes(self):
+        """Test category/option lookups and index rebuild on assignment."""
+        self.processor.env_options = self.mock_options
+        
+        assert self.processor.find_options("Database", "postgres") == [self.mock_options[1]]
+        assert self.processor.find_options("Database") == self.mock_options[:2]
+        assert self.processor.find_options("Database", "mysql") == []
+        assert self.processor.find_options("NonExistent") == []
+        
+        self.processor.env_options = self.mock_options[2:]
+        
+        assert self.processor.has_category("Database") is False
+        assert self.processor.get_template_structure() == {"VectorStore": ["chroma"]}
+        assert self.processor.generate_by_selection([{"category": "Database"}]) == {}
+    
+    def test_in_place_changes_rebuild_indexes(self):
+        """Test that modifying env_options in place keeps lookups in sync."""
+        options = self.processor.env_options
+        options.extend(self.mock_options)
+        
+        assert self.processor.has_category("Database") is True
+        assert self.processor.get_options("Database") == ["postgres", "sqlite"]
+        
+        del options[0]
+        assert self.processor.get_options("Database") == ["postgres"]
+        
+        options.clear()
+        assert self.processor.get_template_structure() == {}
+        
+        # A list replaced by a new assignment no longer affects the processor
+        self.processor.env_options = self.mock_options[:1]
+        options.extend(self.mock_options)
+        assert self.processor.get_template_structure() == {"Database": ["sqlite"]}
+    
+    def test_in_place_appends_rebuild_indexes_once(self):
+        """Test that item-by-item appends rebuild the indexes on the next lookup only."""
+        options = self.processor.env_options
+        with patch.object(self.processor, '_compute_stats',
+                          wraps=self.processor._compute_stats) as compute_stats:
+            for option in self.mock_options * 50:
+                options.append(option)
+            assert compute_stats.call_count == 0
+            
+            version = self.processor.catalog_version
+            assert self.processor.get_options("Database") == ["postgres", "sqlite"]
+            assert self.processor.get_category_stats("VectorStore").variables == 1
+            assert self.processor.catalog_version == version
+            assert compute_stats.call_count == 1
+    
+    def test_catalog_stats(self):
+        """Test statistics computed when options are loaded."""
+        from oneenv.info_api import get_detailed_structure, get_structure_info
+        self.processor.env_options = self.mock_options
+        
+        postgres = self.processor.get_option_stats("Database", "postgres")
+        database = self.processor.get_category_stats("Database")
+        assert (postgres.variables, postgres.required, postgres.optional) == (2, 1, 1)
+        assert database.importance_counts() == {"critical": 2, "important": 0, "optional": 1}
+        assert self.processor.get_option_stats("Database", "mysql").variables == 0
+        
+        with patch('oneenv.info_api._scaffolding_processor', self.processor):
+            detailed = get_detailed_structure()
+            info = get_structure_info(json_format=True)
+        
+        assert detailed["categories"]["Database"]["total_variables"] == 3
+        assert detailed["categories"]["Database"]["required_variables"] == 2
+        assert detailed["metadata"]["total_variables"] == 4
+        assert info["categories"]["Database"]["variable_counts"] == {"postgres": 2, "sqlite": 1}
+        assert info["summary"]["total_variables"] == 4
 
 
 class TestValidateScaffoldingFormat:
@@ -497,6 +567,56 @@ class TestValidateScaffoldingFormat:
             validate_scaffolding_format(invalid_data)
 
 
+class TestBuildEnvOptions:
+    """Test suite for single-pass validation and conversion."""
+    
+    def test_build_env_options_valid(self):
+        """Test that valid data is converted to EnvOption models."""
+        from oneenv.models import build_env_options
+        options = build_env_options("db_template", [
+            {
+                "category": " Database ",
+                "option": "postgres",
+                "env": {
+                    "DATABASE_URL": {"description": "PostgreSQL URL", "required": True,
+                                     "importance": "critical"}
+                }
+            }
+        ])
+        
+        assert len(options) == 1
+        assert isinstance(options[0], EnvOption)
+        assert options[0].category == "Database"
+        assert options[0].env["DATABASE_URL"].importance == "critical"
+    
+    def test_build_env_options_reports_every_error(self):
+        """Test that all errors are reported with option/variable paths."""
+        from oneenv.models import build_env_options
+        invalid_data = [
+            {"category": "Database", "option": "sqlite",
+             "env": {"DATABASE_URL": {"default": "sqlite:///app.db"}}},
+            {"category": "Database", "option": "postgres",
+             "env": {"DATABASE_SSL": {"description": "SSL mode", "choices": ["on"], "default": "off"}}},
+            {"category": "Database", "option": "sqlite",
+             "env": {"DATABASE_URL": {"description": "Duplicate option"}}},
+        ]
+        
+        with pytest.raises(ValueError) as exc_info:
+            build_env_options("db_template", invalid_data)
+        
+        message = str(exc_info.value)
+        assert "db_template" in message
+        assert "Option 0 (Database/sqlite) env.DATABASE_URL.description" in message
+        assert "Option 1 (Database/postgres) env.DATABASE_SSL" in message
+        assert "Option 2: Duplicate category/option pair: Database/sqlite" in message
+    
+    def test_build_env_options_not_list(self):
+        """Test that non-list templates are rejected."""
+        from oneenv.models import build_env_options
+        with pytest.raises(ValueError, match="must be a list"):
+            build_env_options("legacy", {"VAR": {"description": "x"}})
+
+
 class TestGenerateEnvFileContent:
     """Test suite for generate_env_file_content function."""
     
@@ -575,5 +695,142 @@ class TestGenerateEnvFileContent:
         assert "ZEBRA_VAR=zebra" in content
 
 
+
+class TestStreamingRenderer:
+    """Test the chunked renderers against the string APIs"""
+
+    def make_variables(self, count):
+        importances = ["critical", "important", "optional"]
+        return {
+            f"VAR_{i:04d}": {
+                "config": EnvVarConfig(
+                    description=f"Variable {i}\nwith a second line",
+                    default=str(i),
+                    required=i % 2 == 0,
+                    choices=[str(i), "b"] if i % 5 == 0 else None,
+                    importance=importances[i % 3]
+                ),
+                "category": f"Category{i % 7}",
+                "option": f"option{i % 4}"
+            }
+            for i in range(count)
+        }
+
+    def test_iter_joined_lines(self):
+        from oneenv.core import iter_joined_lines
+
+        for lines in ([], [""], ["a"], ["a", "", "b", ""], ["x" * 10] * 50):
+            chunks = list(iter_joined_lines(lines, chunk_size=16))
+            assert "".join(chunks) == "\n".join(lines)
+            assert all(len(chunk) < 16 + 11 for chunk in chunks)
+
+    def test_chunks_match_string_api(self):
+        from oneenv.core import iter_env_file_content
+
+        variables = self.make_variables(2000)
+        chunks = list(iter_env_file_content(variables))
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == generate_env_file_content(variables)
+
+    def test_stream_template_matches_generate_template(self):
+        import io
+        from oneenv.core import generate_template, stream_template
+
+        processor = ScaffoldingTemplateProcessor()
+        processor.env_options = [
+            EnvOption(category="Database", option="sqlite",
+                      env={"DATABASE_URL": EnvVarConfig(description="SQLite URL", default="sqlite:///app.db")}),
+            EnvOption(category="Database", option="postgres",
+                      env={"DATABASE_URL": EnvVarConfig(description="Postgres URL", required=True)}),
+        ]
+        selection = [{"category": "Database"}]
+        buffer = io.StringIO()
+
+        with patch('oneenv.core._scaffolding_processor', processor):
+            written = stream_template(buffer, selection)
+            expected = generate_template("", selection)
+
+        assert buffer.getvalue() == expected
+        assert written == len(expected)
+
+    def test_stream_env_example_matches_template(self):
+        import io
+
+        buffer = io.StringIO()
+        written = oneenv.stream_env_example(buffer)
+
+        assert buffer.getvalue() == oneenv.template()
+        assert written == len(buffer.getvalue())
+
+
+
+class TestRenderCache:
+    """Test the generate_template() render cache"""
+
+    def setup_method(self):
+        from oneenv.core import clear_render_cache
+        clear_render_cache()
+        self.processor = ScaffoldingTemplateProcessor()
+        self.processor.env_options = [
+            EnvOption(category="Database", option="sqlite",
+                      env={"DATABASE_URL": EnvVarConfig(description="SQLite URL", default="sqlite:///app.db")}),
+        ]
+
+    def test_repeat_requests_hit(self):
+        from oneenv.core import generate_template, get_render_cache_info
+        selection = [{"category": "Database", "option": "sqlite"}]
+
+        with patch('oneenv.core._scaffolding_processor', self.processor), \
+                patch.object(self.processor, 'generate_by_selection',
+                             wraps=self.processor.generate_by_selection) as select:
+            first = generate_template("", selection)
+            second = generate_template("", [{"category": "Database", "option": "sqlite"}])
+
+        assert second is first
+        assert select.call_count == 1
+        info = get_render_cache_info()
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    def test_catalog_change_invalidates(self):
+        from oneenv.core import generate_template
+        selection = [{"category": "Database"}]
+
+        with patch('oneenv.core._scaffolding_processor', self.processor):
+            before = generate_template("", selection)
+            self.processor.env_options = self.processor.env_options + [
+                EnvOption(category="Database", option="postgres",
+                          env={"DATABASE_URL": EnvVarConfig(description="Postgres URL")}),
+            ]
+            after = generate_template("", selection)
+
+        assert "POSTGRES_DATABASE_URL" not in before
+        assert "POSTGRES_DATABASE_URL" in after
+
+    def test_invalid_ranges_are_not_served_from_cache(self):
+        from oneenv.core import generate_template, get_render_cache_info
+
+        with patch('oneenv.core._scaffolding_processor', self.processor):
+            generate_template("", [{"category": "Database"}])
+            with pytest.raises(ValueError, match="must be non-empty string if provided"):
+                generate_template("", [{"category": "Database", "option": None}])
+            with pytest.raises(ValueError, match="not found"):
+                generate_template("", [{"category": "Cache"}])
+
+        assert get_render_cache_info().currsize == 1
+
+    def test_lru_eviction(self):
+        from oneenv import core
+        cache = core.RenderCache(maxsize=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        assert cache.get("a") == "A"
+        cache.put("c", "C")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "A" and cache.get("c") == "C"
+        assert cache.info() == core.RenderCacheInfo(hits=3, misses=1, maxsize=2, currsize=2)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+Tests for static discovery of @oneenv template modules
+"""
+
+import os
+import sys
+import textwrap
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import oneenv
+from oneenv.scanner import find_template_modules, source_registers_templates
+
+
+@pytest.fixture
+def source_tree(tmp_path):
+    """A project tree with template modules and modules with import side effects"""
+    files = {
+        "scan_plain.py": "VALUE = 1\n",
+        "scan_side_effect.py": "raise RuntimeError('imported a non-template module')\n",
+        "scan_decorated.py": """
+            import oneenv
+
+            @oneenv.oneenv
+            def decorated_template():
+                return {"SCAN_DECORATED_VAR": {"description": "Decorated"}}
+        """,
+        "scan_pkg/__init__.py": "",
+        "scan_pkg/settings.py": """
+            from oneenv import oneenv as register
+
+            @register
+            def aliased_template():
+                return {"SCAN_ALIASED_VAR": {"description": "Aliased"}}
+        """,
+        "scan_pkg/helpers.py": "raise RuntimeError('imported a helper module')\n",
+        "scan_classes.py": """
+            from oneenv import OneEnv
+
+            class ClassTemplate(OneEnv):
+                def get_template(self):
+                    return {}
+        """,
+        "not_a_package/scan_hidden.py": "from oneenv import oneenv\n@oneenv\ndef f(): pass\n",
+    }
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(textwrap.dedent(content))
+    return tmp_path
+
+
+class TestSourceScanning:
+    """Test AST detection of template registrations"""
+
+    def test_source_registers_templates(self):
+        assert source_registers_templates(b"from oneenv import oneenv\n@oneenv\ndef f(): pass\n")
+        assert source_registers_templates(b"import oneenv as oe\n@oe.oneenv\ndef f(): pass\n")
+        assert source_registers_templates(b"import oneenv\nclass T(oneenv.OneEnv): pass\n")
+        assert not source_registers_templates(b"import oneenv\noneenv.load_dotenv()\n")
+        assert not source_registers_templates(b"def f(): pass\n")
+        assert not source_registers_templates(b"oneenv = (\n")
+
+    def test_find_template_modules(self, source_tree):
+        modules = find_template_modules([str(source_tree)])
+
+        assert modules == ["scan_classes", "scan_decorated", "scan_pkg.settings"]
+
+
+class TestImportTemplatesAst:
+    """Test import_templates(scan="ast")"""
+
+    def test_imports_only_template_modules(self, source_tree, monkeypatch):
+        monkeypatch.chdir(source_tree)
+        monkeypatch.syspath_prepend(str(source_tree))
+        for name in list(sys.modules):
+            if name.startswith("scan_"):
+                monkeypatch.delitem(sys.modules, name)
+
+        imported = oneenv.import_templates(scan="ast")
+
+        assert imported == ["scan_classes", "scan_decorated", "scan_pkg.settings"]
+        assert "scan_side_effect" not in sys.modules
+        assert "scan_pkg.helpers" not in sys.modules
+
+    def test_invalid_scan_mode(self):
+        with pytest.raises(ValueError, match="scan must be"):
+            oneenv.import_templates(scan="everything")
+
+
+class TestScanCache:
+    """Test the persistent mtime-keyed scan index"""
+
+    @pytest.fixture
+    def count_parses(self, monkeypatch, tmp_path):
+        from oneenv import scanner
+        monkeypatch.setenv("ONEENV_CACHE_DIR", str(tmp_path / "cache"))
+        parsed = []
+        original = scanner.scan_file
+
+        def counting_scan_file(path):
+            parsed.append(os.path.basename(path))
+            return original(path)
+
+        monkeypatch.setattr(scanner, "scan_file", counting_scan_file)
+        return parsed
+
+    def test_warm_scan_does_not_parse(self, source_tree, count_parses):
+        first = find_template_modules([str(source_tree)])
+        parsed_cold = len(count_parses)
+        count_parses.clear()
+
+        second = find_template_modules([str(source_tree)])
+
+        assert parsed_cold > 0
+        assert count_parses == []
+        assert second == first
+
+    def test_changed_and_removed_files(self, source_tree, count_parses):
+        find_template_modules([str(source_tree)])
+        count_parses.clear()
+
+        (source_tree / "scan_plain.py").write_text(
+            "from oneenv import oneenv\n\n@oneenv\ndef plain_template():\n    return {}\n"
+        )
+        (source_tree / "scan_classes.py").unlink()
+        modules = find_template_modules([str(source_tree)])
+
+        assert count_parses == ["scan_plain.py"]
+        assert modules == ["scan_decorated", "scan_pkg.settings", "scan_plain"]
+
+    def test_use_cache_requires_cache_dir(self, source_tree, monkeypatch):
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+        with pytest.raises(ValueError, match="ONEENV_CACHE_DIR"):
+            find_template_modules([str(source_tree)], use_cache=True)
+
+
+class TestParallelScan:
+    """Test scanning in worker processes"""
+
+    def test_matches_in_process_scan(self, source_tree, monkeypatch):
+        from oneenv import scanner
+        monkeypatch.delenv("ONEENV_CACHE_DIR", raising=False)
+        monkeypatch.setattr(scanner, "PARALLEL_MIN_FILES", 0)
+
+        serial = find_template_modules([str(source_tree)])
+        parallel = find_template_modules([str(source_tree)], processes=2)
+
+        assert parallel == serial
+
+    def test_parallel_scan_fills_cache(self, source_tree, monkeypatch, tmp_path):
+        from oneenv import scanner
+        monkeypatch.setenv("ONEENV_CACHE_DIR", str(tmp_path / "cache"))
+        monkeypatch.setattr(scanner, "PARALLEL_MIN_FILES", 0)
+        find_template_modules([str(source_tree)], processes=2)
+
+        monkeypatch.setattr(scanner, "_scan_paths", lambda paths, processes: pytest.fail(
+            f"re-parsed {paths}") if paths else set())
+        modules = find_template_modules([str(source_tree)], processes=2)
+
+        assert modules == ["scan_classes", "scan_decorated", "scan_pkg.settings"]
+
+    def test_invalid_process_count(self, source_tree):
+        with pytest.raises(ValueError, match="processes"):
+            find_template_modules([str(source_tree)], processes=-1)
+        with pytest.raises(ValueError, match="scan='ast'"):
+            oneenv.import_templates(processes=2)
@@ -0,0 +1,134 @@
+"""
+Tests for atomic, skip-if-unchanged output writes
+"""
+
+import os
+import stat
+import sys
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import oneenv
+from oneenv.core import ScaffoldingTemplateProcessor
+from oneenv.models import EnvOption, EnvVarConfig
+from oneenv.writer import file_digest, write_text
+
+
+def set_old_mtime(path):
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    return os.stat(path).st_mtime_ns
+
+
+class TestWriteText:
+    """Test writer.write_text"""
+
+    def test_unchanged_file_is_not_touched(self, tmp_path):
+        path = tmp_path / ".env.example"
+        assert write_text(str(path), "A=1\n") is True
+        mtime = set_old_mtime(path)
+
+        assert write_text(str(path), "A=1\n") is False
+        assert write_text(str(path), iter(["A", "=1\n"])) is False
+        assert os.stat(path).st_mtime_ns == mtime
+
+    def test_unchanged_stream_leaves_directory_untouched(self, tmp_path):
+        path = tmp_path / ".env.example"
+        content = "A=1\n" * 500_000  # larger than HASH_BLOCK_SIZE, so spooled to disk
+        path.write_text(content)
+        mtime = set_old_mtime(tmp_path)
+
+        assert write_text(str(path), iter(content.splitlines(keepends=True))) is False
+        assert os.stat(tmp_path).st_mtime_ns == mtime
+
+        assert write_text(str(path), iter([content, "B=2\n"])) is True
+        assert path.read_text() == content + "B=2\n"
+        assert os.listdir(tmp_path) == [".env.example"]
+
+    def test_changed_file_is_replaced(self, tmp_path):
+        path = tmp_path / ".env.example"
+        path.write_text("A=1\n")
+        os.chmod(path, 0o600)
+        set_old_mtime(path)
+
+        assert write_text(str(path), iter(["A=2\n", "B=3\n"])) is True
+        assert path.read_text() == "A=2\nB=3\n"
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        assert os.listdir(tmp_path) == [".env.example"]
+
+    def test_same_size_different_content(self, tmp_path):
+        path = tmp_path / "out.env"
+        path.write_text("A=1\n")
+
+        assert file_digest(str(path), 3) is None
+        assert write_text(str(path), "A=2\n") is True
+        assert path.read_text() == "A=2\n"
+
+    def test_failed_write_leaves_no_temp_file(self, tmp_path):
+        path = tmp_path / "out.env"
+        path.write_text("original")
+
+        def chunks():
+            yield "partial"
+            raise RuntimeError("render failed")
+
+        with pytest.raises(RuntimeError):
+            write_text(str(path), chunks())
+        assert path.read_text() == "original"
+        assert os.listdir(tmp_path) == ["out.env"]
+
+
+class TestSkipUnchangedApis:
+    """Test write_template and generate_env_example(skip_unchanged=True)"""
+
+    @pytest.fixture
+    def processor(self):
+        processor = ScaffoldingTemplateProcessor()
+        processor.env_options = [
+            EnvOption(category="Database", option="sqlite",
+                      env={"DATABASE_URL": EnvVarConfig(description="SQLite URL",
+                                                        default="sqlite:///app.db")}),
+        ]
+        with patch('oneenv.core._scaffolding_processor', processor):
+            yield processor
+
+    def test_write_template(self, processor, tmp_path):
+        path = tmp_path / ".env"
+        selection = [{"category": "Database", "option": "sqlite"}]
+
+        assert oneenv.write_template(str(path), selection) is True
+        assert path.read_text() == oneenv.generate_template("", selection)
+        mtime = set_old_mtime(path)
+
+        assert oneenv.write_template(str(path), selection) is False
+        assert os.stat(path).st_mtime_ns == mtime
+
+    def test_write_template_missing_parent(self, processor, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            oneenv.write_template(str(tmp_path / "missing" / ".env"), [{"category": "Database"}])
+
+    def test_generate_env_example(self, tmp_path):
+        path = tmp_path / ".env.example"
+
+        assert oneenv.generate_env_example(str(path), skip_unchanged=True) is True
+        assert path.read_text() == oneenv.template()
+        mtime = set_old_mtime(path)
+
+        assert oneenv.generate_env_example(str(path), skip_unchanged=True) is False
+        assert os.stat(path).st_mtime_ns == mtime
+
+    def test_generate_env_example_keeps_file_on_error(self, tmp_path):
+        path = tmp_path / ".env.example"
+        path.write_text("original")
+
+        def chunks(debug=False):
+            yield "partial"
+            raise RuntimeError("render failed")
+
+        with patch('oneenv.core.iter_template_enhanced', chunks):
+            with pytest.raises(RuntimeError):
+                oneenv.generate_env_example(str(path))
+        assert path.read_text() == "original"
+        assert os.listdir(tmp_path) == [".env.example"]